@@ -0,0 +1,62 @@
+import argparse
+import functools
+import random
+import time
+from utils.blacklist_index import BlacklistIndex
+
+# Per-message cost of the blacklist check in CupidBlacklist.on_message for the
+# common case (author not blacklisted), old list + str(id) lookup vs BlacklistIndex.
+# Usage: python bench_blacklist.py [--messages 1000000] [--blacklisted 500] > bench_output.txt
+
+CHANNELS = [1273939243600842795, 1273939292749561866, 1273945454853492746, 1273926745724026891]
+
+
+def snowflake(rng):
+    return rng.randrange(10 ** 17, 10 ** 19)
+
+
+def old_check(channels, blacklist, channel_id, user_id):
+    if channel_id not in channels:
+        return False
+    return str(user_id) in blacklist
+
+
+def run(messages, blacklisted, guarded_share, seed):
+    rng = random.Random(seed)
+    blacklist = {str(snowflake(rng)): {"reason": "bench"} for _ in range(blacklisted)}
+    index = BlacklistIndex(CHANNELS, blacklist)
+    other_channels = [snowflake(rng) for _ in range(20)]
+
+    # Messages from non-blacklisted users, `guarded_share` of them in a guarded channel
+    traffic = [
+        (rng.choice(CHANNELS) if rng.random() < guarded_share else rng.choice(other_channels), snowflake(rng))
+        for _ in range(messages)
+    ]
+
+    results = {}
+    for name, check in (
+        ("old (list + str)", functools.partial(old_check, CHANNELS, blacklist)),
+        ("index (frozenset + int set)", index.blocks),
+    ):
+        t0 = time.perf_counter()
+        hits = 0
+        for channel_id, user_id in traffic:
+            if check(channel_id, user_id):
+                hits += 1
+        elapsed = time.perf_counter() - t0
+        results[name] = elapsed
+        print(f"{name:30s} {elapsed / messages * 1e9:8.1f} ns/message  ({hits} blocked)")
+
+    old, new = results.values()
+    print(f"speedup: {old / new:.2f}x  ({messages} messages, {blacklisted} blacklisted, "
+          f"{guarded_share:.0%} in guarded channels)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Blacklist hot-path benchmark")
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--blacklisted", type=int, default=500)
+    parser.add_argument("--guarded-share", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.messages, args.blacklisted, args.guarded_share, args.seed)
@@ -0,0 +1,74 @@
+import argparse
+import random
+import time
+import tracemalloc
+from utils.scheduler import HeapScheduler
+from utils.timing_wheel import TimingWheel
+
+# Fills a reminder backend with N reminders spread over the next 30 days and
+# reports memory, insert / cancel cost and the cost of moving time forward.
+# Usage: python bench_reminders.py [--count 1000000] [--backend wheel|heap|both] > bench_output.txt
+
+START = 1_700_000_000
+
+
+def make_backend(name):
+    return TimingWheel(now=START) if name == "wheel" else HeapScheduler()
+
+
+def run(name, count, seed):
+    rng = random.Random(seed)
+    dues = [START + 60 + rng.random() * 30 * 86400 for _ in range(count)]
+
+    tracemalloc.start()
+    backend = make_backend(name)
+    t0 = time.perf_counter()
+    for reminder_id, due in enumerate(dues):
+        backend.add(reminder_id, due)
+    insert_time = time.perf_counter() - t0
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    cancel_ids = rng.sample(range(count), count // 10)
+    t0 = time.perf_counter()
+    for reminder_id in cancel_ids:
+        backend.cancel(reminder_id)
+    cancel_time = time.perf_counter() - t0
+
+    # One hour of 1-second ticks (what a busy bot sees), then a 1-day jump
+    ticks = 3600
+    fired = 0
+    t0 = time.perf_counter()
+    for second in range(1, ticks + 1):
+        fired += len(backend.pop_due(START + second))
+    tick_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fired_day = len(backend.pop_due(START + ticks + 86400))
+    day_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        backend.next_due()
+    next_due_time = (time.perf_counter() - t0) / 1000
+
+    print(f"[{name}] {count:,} reminders")
+    print(f"  memory           : {memory / 1024 / 1024:.1f} MiB ({memory / count:.0f} B/reminder)")
+    print(f"  insert           : {insert_time / count * 1e6:.2f} µs/reminder")
+    print(f"  cancel           : {cancel_time / len(cancel_ids) * 1e6:.2f} µs/reminder")
+    print(f"  tick (1s, 1h)    : {tick_time / ticks * 1e6:.1f} µs/tick, {fired:,} fired")
+    print(f"  jump (1 day)     : {day_time * 1e3:.1f} ms, {fired_day:,} fired")
+    print(f"  next_due         : {next_due_time * 1e6:.1f} µs")
+    print(f"  still pending    : {len(backend):,}")
+    print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reminder scheduler benchmark")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--backend", choices=("wheel", "heap", "both"), default="both")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for name in (("wheel", "heap") if args.backend == "both" else (args.backend,)):
+        run(name, args.count, args.seed)
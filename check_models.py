@@ -1,18 +1,20 @@
 import google.generativeai as genai
-import os
 from dotenv import load_dotenv
+from utils.key_pool import KeyPool
 
 load_dotenv()
-api_key = os.getenv('AI_API_KEY')
+pool = KeyPool.from_env()
 
-if not api_key:
-    print("Error: AI_API_KEY not found in .env")
+if not pool:
+    print("Error: AI_API_KEY / AI_API_KEYS not found in .env")
 else:
-    genai.configure(api_key=api_key)
-    print("Authenticated. Scanning available models...\n")
-    try:
-        for m in genai.list_models():
-            if 'generateContent' in m.supported_generation_methods:
-                print(f"- {m.name}")
-    except Exception as e:
-        print(f"Error: {e}")
\ No newline at end of file
+    for key in pool.keys:
+        genai.configure(api_key=key.value)
+        print(f"[{key.name} …{key.value[-4:]}] Authenticated. Scanning available models...\n")
+        try:
+            for m in genai.list_models():
+                if 'generateContent' in m.supported_generation_methods:
+                    print(f"- {m.name}")
+        except Exception as e:
+            print(f"Error: {e}")
+        print()
@@ -1,6 +1,41 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
+import asyncio
+import os
+import re
 import time
+from collections import deque
+from utils.db import Database
+from utils.messages import split_lines
+from utils.outbound import get_outbound, REPLY
+from utils.scheduler import HeapScheduler
+
+AFK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS afk (
+    user_id INTEGER PRIMARY KEY,
+    reason TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    expires_at REAL
+);
+"""
+
+# AFK_MAX_AGE=1209600 (seconds) caps how long anyone stays AFK; unset / 0 = forever
+AFK_MAX_AGE = int(os.getenv('AFK_MAX_AGE', '0')) or None
+DURATION_RE = re.compile(r'^(?:\d+[smhd])+$')
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+PING_BUFFER_SIZE = 20       # pings remembered per AFK user (oldest dropped first)
+AFK_REPLY_COOLDOWN = 300    # seconds between "X is AFK" replies for the same user in one channel
+
+class AFKPing:
+    """One ping received while AFK"""
+    __slots__ = ("channel_id", "author_id", "jump_url", "timestamp")
+    
+    def __init__(self, channel_id, author_id, jump_url, timestamp):
+        self.channel_id = channel_id
+        self.author_id = author_id
+        self.jump_url = jump_url
+        self.timestamp = timestamp
 
 class AFK(commands.Cog):
     """AFK System"""
@@ -8,6 +43,103 @@ class AFK(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.afk_data = {}
+        
+        # Pings received while AFK (bounded ring buffer per user) + reply cooldowns per channel
+        self.afk_pings = {}          # user_id -> deque[AFKPing]
+        self.afk_ping_counts = {}    # user_id -> total pings (including ones that fell out of the buffer)
+        self.afk_reply_times = {}    # user_id -> {channel_id: last "is AFK" reply time}
+        
+        # AFK entries expire (per-user duration or AFK_MAX_AGE) through a timed queue, not a dict scan
+        self.expiry_queue = HeapScheduler()
+        self.wakeup = asyncio.Event()
+        
+        self.outbound = get_outbound()
+        
+        # AFK status survives restarts; loaded on the first message after startup
+        self.db = Database('afk.db', AFK_SCHEMA)
+        columns = {row[1] for row in self.db.query_sync("PRAGMA table_info(afk)")}
+        if "expires_at" not in columns:
+            self.db.query_sync("ALTER TABLE afk ADD COLUMN expires_at REAL")
+        self.loaded = False
+        self._loading = None
+        
+        # The cog's one background timer
+        self.afk_timer.start()
+    
+    async def cog_unload(self):
+        # Let the timer and a running load wind down before the database goes away
+        self.afk_timer.cancel()
+        pending = [task for task in (self.afk_timer.get_task(), self._loading) if task is not None]
+        await asyncio.gather(*pending, return_exceptions=True)
+        self.db.close()
+    
+    async def ensure_loaded(self):
+        """Pull AFK state from disk once (every caller awaits the same load)"""
+        if self.loaded:
+            return
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load())
+        await self._loading
+    
+    async def _load(self):
+        rows = await self.db.query("SELECT user_id, reason, timestamp, expires_at FROM afk")
+        for user_id, reason, timestamp, expires_at in rows:
+            # Anything set since startup wins over the stored copy
+            if user_id in self.afk_data:
+                continue
+            self.afk_data[user_id] = {"reason": reason, "timestamp": timestamp, "expires_at": expires_at}
+            self.schedule_expiry(user_id, timestamp, expires_at)
+        self.loaded = True
+    
+    def schedule_expiry(self, user_id, timestamp, expires_at):
+        """Queue the AFK entry for eviction at whichever comes first: its own expiry or the max age"""
+        deadline = expires_at
+        if AFK_MAX_AGE is not None:
+            cap = timestamp + AFK_MAX_AGE
+            deadline = cap if deadline is None else min(deadline, cap)
+        if deadline is None:
+            return
+        next_due = self.expiry_queue.next_due()
+        self.expiry_queue.add(user_id, deadline)
+        if next_due is None or deadline < next_due:
+            self.wakeup.set()
+    
+    def remove_afk(self, user_id):
+        """Drop a user's AFK entry everywhere (memory, disk, expiry queue)"""
+        self.afk_data.pop(user_id, None)
+        self.expiry_queue.cancel(user_id)
+        self.db.submit("DELETE FROM afk WHERE user_id = ?", (user_id,))
+    
+    @tasks.loop()
+    async def afk_timer(self):
+        """Sleep until the next AFK entry expires (or a sooner one is queued), then evict it"""
+        self.wakeup.clear()
+        next_due = self.expiry_queue.next_due()
+        if next_due is None or next_due > time.time():
+            timeout = 3600 if next_due is None else min(next_due - time.time(), 3600)
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        
+        for user_id in self.expiry_queue.pop_due(time.time()):
+            self.afk_data.pop(user_id, None)
+            self.clear_pings(user_id)
+            self.db.submit("DELETE FROM afk WHERE user_id = ?", (user_id,))
+        
+        # Reply cooldowns older than the window are useless - prune them on the same timer
+        cutoff = time.monotonic() - AFK_REPLY_COOLDOWN
+        for user_id in list(self.afk_reply_times):
+            channels = self.afk_reply_times[user_id]
+            for channel_id in [c for c, t in channels.items() if t < cutoff]:
+                del channels[channel_id]
+            if not channels:
+                del self.afk_reply_times[user_id]
+    
+    @afk_timer.before_loop
+    async def before_afk_timer(self):
+        await self.bot.wait_until_ready()
+        await self.ensure_loaded()
     
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -15,6 +147,13 @@ class AFK(commands.Cog):
         # Ignore messages from bots
         if message.author.bot:
             return
+        
+        if not self.loaded:
+            await self.ensure_loaded()
+        
+        # Fast path: nobody is AFK, so there's nothing to do for this message
+        if not self.afk_data:
+            return
             
         user_id = message.author.id
         
@@ -31,17 +170,30 @@ class AFK(commands.Cog):
                 time_str = f"{hours}h {minutes}m {seconds}s" if hours > 0 else f"{minutes}m {seconds}s"
                 
                 # Remove user from AFK data
-                del self.afk_data[user_id]
+                self.remove_afk(user_id)
                 
                 # Send welcome back message
-                await message.channel.send(
+                self.outbound.send(
+                    message.channel,
                     f"{message.author.mention} 𝘳𝘦𝘵𝘶𝘳𝘯𝘴 𝘧𝘳𝘰𝘮 𝘵𝘩𝘦 𝘢𝘣𝘺𝘴𝘴..𝘺𝘰𝘶𝘳 𝘈𝘍𝘒 𝘴𝘵𝘢𝘵𝘶𝘴 𝘩𝘢𝘴 𝘣𝘦𝘦𝘯 𝘳𝘦𝘮𝘰𝘷𝘦𝘥. "
-                    f"(𝘠𝘰𝘶 𝘸𝘦𝘳𝘦 𝘢𝘸𝘢𝘺 𝘧𝘰𝘳 {time_str})"
+                    f"(𝘠𝘰𝘶 𝘸𝘦𝘳𝘦 𝘢𝘸𝘢𝘺 𝘧𝘰𝘳 {time_str})",
+                    priority=REPLY
                 )
+                
+                # One digest of everyone who pinged them while they were away
+                await self.send_ping_digest(message.author, message.channel)
+        
+        # Check if message mentions any AFK users: set intersection instead of a lookup per mention
+        if not message.mentions or not self.afk_data:
+            return
+        afk_mentioned = self.afk_data.keys() & {member.id for member in message.mentions}
+        afk_mentioned.discard(user_id)  # Ensure they don't ping themselves
+        if not afk_mentioned:
+            return
         
-        # Check if message mentions any AFK users
         for member in message.mentions:
-            if member.id in self.afk_data and member.id != user_id:  # Ensure they don't ping themselves
+            if member.id in afk_mentioned:
+                afk_mentioned.discard(member.id)  # mentions can repeat the same member
                 afk_info = self.afk_data[member.id]
                 afk_time = int(message.created_at.timestamp() - afk_info["timestamp"])
                 
@@ -50,21 +202,93 @@ class AFK(commands.Cog):
                 minutes, seconds = divmod(remainder, 60)
                 time_str = f"{hours}h {minutes}m {seconds}s" if hours > 0 else f"{minutes}m {seconds}s"
                 
-                # Reply with AFK status
-                await message.reply(
+                # Remember the ping for the digest they get when they come back
+                self.record_ping(member.id, message)
+                
+                # Reply with AFK status, at most once per cooldown window per channel
+                now = time.monotonic()
+                channel_replies = self.afk_reply_times.setdefault(member.id, {})
+                last_reply = channel_replies.get(message.channel.id)
+                if last_reply is not None and now - last_reply < AFK_REPLY_COOLDOWN:
+                    continue
+                channel_replies[message.channel.id] = now
+                
+                self.outbound.reply(
+                    message,
                     f"**{member.display_name}** 𝑖𝑠 𝑐𝑢𝑟𝑟𝑒𝑛𝑡𝑙𝑦 𝐴𝐹𝐾: {afk_info['reason']} "
                     f"(𝐴𝐹𝐾 𝑓𝑜𝑟 {time_str})"
                 )
     
-    @commands.command(name='afk', aliases=['away'], help='Set your status as AFK with an optional reason')
+    def record_ping(self, user_id, message):
+        pings = self.afk_pings.get(user_id)
+        if pings is None:
+            pings = self.afk_pings[user_id] = deque(maxlen=PING_BUFFER_SIZE)
+        pings.append(AFKPing(message.channel.id, message.author.id, message.jump_url, message.created_at.timestamp()))
+        self.afk_ping_counts[user_id] = self.afk_ping_counts.get(user_id, 0) + 1
+    
+    def clear_pings(self, user_id):
+        self.afk_reply_times.pop(user_id, None)
+        self.afk_ping_counts.pop(user_id, None)
+        return self.afk_pings.pop(user_id, None)
+    
+    async def send_ping_digest(self, user, fallback_channel):
+        """DM the returning user one message listing who pinged them (channel if DMs are closed)"""
+        total = self.afk_ping_counts.get(user.id, 0)
+        pings = self.clear_pings(user.id)
+        if not pings:
+            return
+        
+        lines = [
+            f"• <@{ping.author_id}> in <#{ping.channel_id}> <t:{int(ping.timestamp)}:R> - [jump]({ping.jump_url})"
+            for ping in pings
+        ]
+        if total > len(pings):
+            lines.append(f"…and {total - len(pings)} earlier ping(s)")
+        
+        embed = discord.Embed(
+            title="𝑊ℎ𝑖𝑙𝑒 𝑦𝑜𝑢 𝑤𝑒𝑟𝑒 𝐴𝐹𝐾..",
+            description=split_lines(lines, limit=4096)[0],
+            color=0xffffff
+        )
+        embed.set_footer(text=f"{total} ping(s) while you were away")
+        
+        try:
+            await self.outbound.send(user, embed=embed, priority=REPLY)
+        except discord.HTTPException:
+            self.outbound.send(fallback_channel, user.mention, embed=embed, priority=REPLY)
+    
+    @commands.command(name='afk', aliases=['away'], help='Set your status as AFK with an optional duration and reason (e.g. a.afk 2h studying)')
     async def afk(self, ctx, *, reason="No reason provided"):
         """Set AFK status"""
+        await self.ensure_loaded()
         user_id = ctx.author.id
+        
+        # Optional leading duration: "a.afk 2h30m sleeping"
+        expires_at = None
+        first, _, rest = reason.partition(' ')
+        if DURATION_RE.match(first.lower()):
+            seconds = sum(int(v) * DURATION_UNITS[u] for v, u in re.findall(r'(\d+)([smhd])', first.lower()))
+            if seconds > 0:
+                expires_at = ctx.message.created_at.timestamp() + seconds
+                reason = rest.strip() or "No reason provided"
+        
+        self.clear_pings(user_id)
         self.afk_data[user_id] = {
             "reason": reason,
-            "timestamp": ctx.message.created_at.timestamp()
+            "timestamp": ctx.message.created_at.timestamp(),
+            "expires_at": expires_at
         }
-        await ctx.send(f"{ctx.author.mention} 𝐷𝑒𝑎𝑟, 𝐼'𝑣𝑒 𝑠𝑒𝑡 𝑦𝑜𝑢𝑟 𝑠𝑡𝑎𝑡𝑢𝑠 𝑡𝑜 𝐴𝐹𝐾: {reason}")
+        self.expiry_queue.cancel(user_id)
+        self.schedule_expiry(user_id, self.afk_data[user_id]["timestamp"], expires_at)
+        self.db.submit(
+            "INSERT OR REPLACE INTO afk (user_id, reason, timestamp, expires_at) VALUES (?, ?, ?, ?)",
+            (user_id, reason, self.afk_data[user_id]["timestamp"], expires_at)
+        )
+        
+        if expires_at:
+            await ctx.send(f"{ctx.author.mention} 𝐷𝑒𝑎𝑟, 𝐼'𝑣𝑒 𝑠𝑒𝑡 𝑦𝑜𝑢𝑟 𝑠𝑡𝑎𝑡𝑢𝑠 𝑡𝑜 𝐴𝐹𝐾: {reason} (𝑢𝑛𝑡𝑖𝑙 <t:{int(expires_at)}:t>)")
+        else:
+            await ctx.send(f"{ctx.author.mention} 𝐷𝑒𝑎𝑟, 𝐼'𝑣𝑒 𝑠𝑒𝑡 𝑦𝑜𝑢𝑟 𝑠𝑡𝑎𝑡𝑢𝑠 𝑡𝑜 𝐴𝐹𝐾: {reason}")
 
 async def setup(bot):
     await bot.add_cog(AFK(bot))
\ No newline at end of file
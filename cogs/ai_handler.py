@@ -1,9 +1,16 @@
 import discord
 from discord.ext import commands
-import google.generativeai as genai
-import os
+from google import genai
+from google.genai import types
 import asyncio
-from collections import deque
+from utils.memory_store import ConversationMemory
+from utils.prompt_cache import get_prompt_cache, PROMPT_CACHES
+from utils.key_pool import get_key_pool, NoKeyAvailable
+from utils.chat_prefilter import ChatPrefilter, SKIP, REACT, REPLY
+from utils.response_cache import ResponseCache
+from utils.outbound import get_outbound, REPLY as REPLY_PRIORITY, FUN
+
+MODEL_NAME = 'models/gemini-2.5-flash-lite'
 
 # UPDATED: System Prompt with stricter personality controls
 SYSTEM_PROMPT = """
@@ -27,77 +34,109 @@ class AIHandler(commands.Cog):
         self.bot = bot
         self.AI_CHANNEL_ID = 1411661529920704512
         
-        api_key = os.getenv('AI_API_KEY')
-        if not api_key:
-            print("⚠️ AI_API_KEY not found in environment variables!")
-        else:
-            genai.configure(api_key=api_key)
-            
-        self.model = genai.GenerativeModel(
-            # UPGRADE: Switching to the high-throughput, high-volume model
-            model_name='models/gemini-2.5-flash-lite', 
-            system_instruction=SYSTEM_PROMPT
-        )
+        # Several keys can be configured (AI_API_KEYS=k1,k2,...); each call goes to the least loaded one
+        self.key_pool = get_key_pool()
+        if not self.key_pool:
+            print("⚠️ AI_API_KEY / AI_API_KEYS not found in environment variables!")
         
         # UPDATED: Increased memory depth
         # 50 messages ~ approx 10-15 minutes of active chat. 
         # Flash handles this easily.
-        self.conversation_memory = {}
+        # Memory is capped globally (idle channels get evicted from RAM) and written
+        # through to memory.db so a restart doesn't wipe the conversation.
+        self.conversation_memory = ConversationMemory(
+            db_path='memory.db',
+            max_turns=50,
+            max_total_turns=5000
+        )
         
-        self.generation_config = genai.types.GenerationConfig(
+        # Local pre-filter: "lol", emoji spam, "ok" etc. never reach Gemini
+        self.prefilter = ChatPrefilter()
+        
+        # Repeated questions ("who made you", "what's the vanity") get answered from here
+        self.response_cache = ResponseCache(max_entries=256, ttl=6 * 3600)
+        
+        self.outbound = get_outbound()
+        self.requests_in_flight = set()  # query_gemini calls, wound down before memory closes
+        
+        # UPGRADE: Switching to the high-throughput, high-volume model
+        self.generation_settings = dict(
             max_output_tokens=400, # Slightly increased for more detailed answers if needed
             temperature=0.85,      # Higher temperature = More variety/creativity
             top_p=0.95,
             top_k=40
         )
 
+    async def cog_unload(self):
+        # A request still waiting on the API would append its answer to a closed memory.db
+        for task in self.requests_in_flight:
+            task.cancel()
+        await asyncio.gather(*self.requests_in_flight, return_exceptions=True)
+        self.conversation_memory.close()
+
+    def generate(self, history):
+        """Blocking API call, runs in the executor"""
+        with self.key_pool.lease() as key:
+            client = self.key_pool.client_for(key, genai.Client)
+            # SYSTEM_PROMPT goes out as cached content once it's over AI_PROMPT_CACHE_MIN_TOKENS, inline until then
+            prompt_cache = get_prompt_cache(key, client, types)
+            return prompt_cache.generate(MODEL_NAME, 'athena-system', SYSTEM_PROMPT, history, **self.generation_settings)
+
     def get_formatted_history(self, channel_id):
         """Retrieve chat history for the API"""
-        if channel_id not in self.conversation_memory:
-            return []
-        return list(self.conversation_memory[channel_id])
+        return self.conversation_memory.history(channel_id)
 
     def update_memory(self, channel_id, role, content):
         """Update short-term memory"""
-        if channel_id not in self.conversation_memory:
-            # UPDATED: Increased from 10 to 50 to remember context longer
-            self.conversation_memory[channel_id] = deque(maxlen=50)
-            
-        self.conversation_memory[channel_id].append({
-            "role": role,
-            "parts": [content]
-        })
+        self.conversation_memory.append(channel_id, role, content)
 
     async def query_gemini(self, user_message, channel_id, user_name):
         """Execute the API query"""
+        task = asyncio.current_task()
+        self.requests_in_flight.add(task)
+        try:
+            return await self._query_gemini(user_message, channel_id, user_name)
+        finally:
+            self.requests_in_flight.discard(task)
+
+    async def _query_gemini(self, user_message, channel_id, user_name):
         # We prepend the username so the bot knows who is talking
         contextualized_input = f"({user_name}): {user_message}"
         
+        # Pull this channel's history back from disk if it was evicted / we just restarted
+        await self.conversation_memory.load(channel_id)
+        
+        # Skip the API entirely for questions we've answered recently (unless they lean on earlier turns)
+        recent_turns = self.conversation_memory.recent(channel_id, 4)
+        cached_answer = self.response_cache.lookup(user_message, recent_turns)
+        
         # Add to memory BEFORE generating (so the bot sees the current question in context)
         self.update_memory(channel_id, "user", contextualized_input)
         
+        if cached_answer:
+            self.update_memory(channel_id, "model", cached_answer)
+            return cached_answer
+        
         history = self.get_formatted_history(channel_id)
         
         try:
             # Run the blocking API call in a separate thread
             response = await self.bot.loop.run_in_executor(
                 None, 
-                lambda: self.model.generate_content(
-                    history,
-                    generation_config=self.generation_config
-                )
+                lambda: self.generate(history)
             )
             
             ai_text = response.text
             
             # Update memory with bot's response
             self.update_memory(channel_id, "model", ai_text)
+            self.response_cache.store(user_message, ai_text, recent_turns, asker=user_name)
             
             return ai_text
             
         except Exception as e:
             print(f"🔴 Gemini API Error: {e}")
-            if "429" in str(e):
+            if isinstance(e, NoKeyAvailable) or "429" in str(e):
                 return "whoops, brain freeze (rate limit)! gimme a sec..."
             return "hmm, something went wrong with my circuits. try again?"
 
@@ -121,8 +160,27 @@ class AIHandler(commands.Cog):
             should_respond = True
 
         if should_respond:
+            cleaned_content = message.content.replace(f'<@{self.bot.user.id}>', '').strip()
+            
+            decision = self.prefilter.classify(
+                cleaned_content,
+                mentioned=self.bot.user in message.mentions,
+                has_attachments=bool(message.attachments or message.stickers)
+            )
+            if decision.action == SKIP:
+                return
+            if decision.action == REACT:
+                self.outbound.react(message, decision.payload, priority=FUN)
+                return
+            if decision.action == REPLY:
+                # Keep canned exchanges in memory so the conversation still flows
+                await self.conversation_memory.load(message.channel.id)
+                self.update_memory(message.channel.id, "user", f"({message.author.display_name}): {cleaned_content or 'Hello!'}")
+                self.update_memory(message.channel.id, "model", decision.payload)
+                self.outbound.reply(message, decision.payload, mention_author=False, priority=REPLY_PRIORITY)
+                return
+            
             async with message.channel.typing():
-                cleaned_content = message.content.replace(f'<@{self.bot.user.id}>', '').strip()
                 if not cleaned_content:
                     cleaned_content = "Hello!"
 
@@ -132,7 +190,87 @@ class AIHandler(commands.Cog):
                     message.author.display_name
                 )
                 
-                await message.reply(response, mention_author=False)
+                await self.outbound.reply(message, response, mention_author=False, priority=REPLY_PRIORITY)
+
+    @commands.command(name='aifilter', help='Show or tune the AI pre-filter (Owner only)')
+    @commands.is_owner()
+    async def aifilter(self, ctx, action: str = None, *, value: str = None):
+        """
+        a.aifilter                       -> stats
+        a.aifilter on / off
+        a.aifilter minlen <n>
+        a.aifilter react <phrase> <emoji>
+        a.aifilter reply <phrase> | <answer>
+        a.aifilter skip <phrase>
+        a.aifilter remove <phrase>
+        """
+        f = self.prefilter
+        
+        if action is None:
+            stats = f.stats()
+            cache = self.response_cache.stats()
+            await ctx.send(
+                f"**AI pre-filter** ({'on' if f.enabled else 'off'}, min length {f.min_length})\n"
+                f"Seen: {stats['total']} | Sent to AI: {stats['sent_to_ai']}\n"
+                f"Skipped: {stats['skipped']} | Reacted: {stats['reacted']} | Canned: {stats['canned']}\n"
+                f"API calls avoided: **{stats['avoided_calls']}**\n"
+                f"Response cache: {cache['hits']} hits / {cache['misses']} misses "
+                f"({cache['bypassed']} bypassed, {cache['entries']} entries)"
+            )
+            return
+        
+        action = action.lower()
+        try:
+            if action in ('on', 'off'):
+                f.enabled = action == 'on'
+            elif action == 'minlen':
+                f.min_length = int(value)
+            elif action == 'react':
+                phrase, emoji = value.rsplit(' ', 1)
+                f.reaction_phrases[f.normalize(phrase)] = emoji
+            elif action == 'reply':
+                phrase, answer = (part.strip() for part in value.split('|', 1))
+                f.canned_responses.setdefault(f.normalize(phrase), []).append(answer)
+            elif action == 'skip':
+                f.skip_phrases.add(f.normalize(value))
+            elif action == 'remove':
+                phrase = f.normalize(value)
+                f.reaction_phrases.pop(phrase, None)
+                f.canned_responses.pop(phrase, None)
+                f.skip_phrases.discard(phrase)
+            else:
+                await ctx.send("Unknown option. Use on/off, minlen, react, reply, skip or remove.")
+                return
+        except (ValueError, AttributeError):
+            await ctx.send("Invalid value for that option.")
+            return
+        
+        await ctx.send(f"✅ AI pre-filter updated ({action}).")
+
+    @commands.command(name='aikeys', help='Show per-key Gemini usage (Owner only)')
+    @commands.is_owner()
+    async def aikeys(self, ctx):
+        """Per-key quota usage and cooldowns"""
+        stats = self.key_pool.stats()
+        if not stats:
+            await ctx.send("No API keys configured.")
+            return
+        
+        lines = []
+        for k in stats:
+            state = f"cooling down {k['cooldown']}s" if k['cooldown'] else "healthy"
+            lines.append(
+                f"**{k['name']}** (…{k['suffix']}) - {k['rpm']}/{k['rpm_limit']} rpm, "
+                f"{k['requests']} requests, {k['rate_limited']} × 429, {state}"
+            )
+            cache = PROMPT_CACHES.get(k['name'])
+            if cache and cache.stats['requests']:
+                c = cache.stats
+                lines.append(
+                    f"↳ prompt cache: {c['tokens_saved']}/{c['prompt_tokens']} input tokens cached "
+                    f"({c['cached_requests']}/{c['requests']} requests)"
+                )
+        await ctx.send("\n".join(lines))
 
 async def setup(bot):
     await bot.add_cog(AIHandler(bot))
\ No newline at end of file
@@ -1,40 +1,41 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import json
-import os
 from typing import List, Union
+from utils.blacklist_store import BlacklistStore
+from utils.blacklist_index import BlacklistIndex
+from utils.user_resolver import UserResolver
+from utils.outbound import get_outbound, MODERATION
 
 class CupidBlacklist(commands.Cog):
     """Cupid Blacklist Management System"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.blacklist_file = 'blacklist.json'
-        self.blacklist = self.load_blacklist()
+        # SQLite-backed (blacklist.json is imported once); self.blacklist mirrors it for reads
+        self.store = BlacklistStore('blacklist.db', legacy_json='blacklist.json')
+        self.blacklist = self.store.load()
+        self.outbound = get_outbound()
+        
+        # User lookups: guild member cache first, then a TTL cache (NotFound is cached too)
+        self.resolver = UserResolver(bot, ttl=600, negative_ttl=3600)
         
         # Configuration - UPDATE THESE IDs AS NEEDED
         self.CUPID_ROLE_ID = 1218983330201075792  # REPLACE WITH CUPID ROLE ID
-        self.BLACKLISTED_CHANNELS = [
+        self.BLACKLISTED_CHANNELS = frozenset({
             1273939243600842795,  # REPLACE WITH CHANNEL 1 ID
             1273939292749561866,  # REPLACE WITH CHANNEL 2 ID  
             1273945454853492746,
             1273926745724026891   # REPLACE WITH CHANNEL 3 ID
-        ]
+        })
         self.ROLE_A_ID = 1418944629427929118  # REPLACE WITH ROLE TO REMOVE (e.g., Form Access)
         self.ROLE_B_ID = 1421220600231231579  # REPLACE WITH ROLE TO ADD (e.g., Blacklisted)
+        
+        # Int-keyed copy for on_message (see bench_blacklist.py); updated with every add/remove
+        self.index = BlacklistIndex(self.BLACKLISTED_CHANNELS, self.blacklist)
     
-    def load_blacklist(self) -> dict:
-        """Load blacklist from JSON file"""
-        if os.path.exists(self.blacklist_file):
-            with open(self.blacklist_file, 'r') as f:
-                return json.load(f)
-        return {}
-    
-    def save_blacklist(self):
-        """Save blacklist to JSON file"""
-        with open(self.blacklist_file, 'w') as f:
-            json.dump(self.blacklist, f, indent=4)
+    def cog_unload(self):
+        self.store.close()
     
     async def check_cupid_permission(self, interaction: discord.Interaction) -> bool:
         """Check if user has cupid role"""
@@ -77,48 +78,9 @@ class CupidBlacklist(commands.Cog):
         except Exception as e:
             print(f"*Error updating roles for {member.display_name}: {e}*")
     
-    async def get_user_info(self, user_id: int) -> dict:
-        """Get user information, trying both guild member and bot's global user cache"""
-        # First try to get as guild member
-        guild = self.bot.guilds[0] if self.bot.guilds else None
-        if guild:
-            member = guild.get_member(user_id)
-            if member:
-                return {
-                    'name': f"{member.display_name} ({member.name})",
-                    'mention': member.mention,
-                    'is_in_server': True
-                }
-        
-        # Try to get user from bot's cache
-        user = self.bot.get_user(user_id)
-        if user:
-            return {
-                'name': f"{user.name}",
-                'mention': f"`{user.name}` (ID: {user_id})",
-                'is_in_server': False
-            }
-        
-        # If user not in cache, try to fetch (this may make an API call)
-        try:
-            user = await self.bot.fetch_user(user_id)
-            return {
-                'name': f"{user.name}",
-                'mention': f"`{user.name}` (ID: {user_id})",
-                'is_in_server': False
-            }
-        except discord.NotFound:
-            return {
-                'name': f"Unknown User (ID: {user_id})",
-                'mention': f"`Unknown User` (ID: {user_id})",
-                'is_in_server': False
-            }
-        except discord.HTTPException:
-            return {
-                'name': f"Unknown User (ID: {user_id})",
-                'mention': f"`Unknown User` (ID: {user_id})",
-                'is_in_server': False
-            }
+    async def get_user_info(self, user_id: int, guild: discord.Guild = None) -> dict:
+        """Get user information for `guild` (member cache, then cached / fetched user)"""
+        return await self.resolver.resolve(user_id, guild)
     
     @app_commands.command(name="blacklist_add", description="Add a user to the nuclear blacklist")
     @app_commands.describe(user="The user to blacklist (mention or user ID)", reason="Reason for blacklisting")
@@ -156,17 +118,20 @@ class CupidBlacklist(commands.Cog):
             return
         
         # Get user info
-        user_info = await self.get_user_info(user_id)
+        user_info = await self.get_user_info(user_id, interaction.guild)
         
         # Add to blacklist
-        self.blacklist[str(user_id)] = {
+        entry = {
             'name': user_info['name'],
             'reason': reason,
             'blacklisted_by': f"{interaction.user.display_name} ({interaction.user.name})",
             'timestamp': interaction.created_at.isoformat(),
             'is_in_server': user_info['is_in_server']
         }
-        self.save_blacklist()
+        # Written to disk first so the mirror never holds an entry the store doesn't
+        await self.store.add(user_id, entry)
+        self.blacklist[str(user_id)] = entry
+        self.index.add(user_id)
         
         # Update roles if user is in server
         if user_info['is_in_server']:
@@ -223,8 +188,9 @@ class CupidBlacklist(commands.Cog):
             return
         
         # Remove from blacklist
+        await self.store.remove(user_id)
         removed_data = self.blacklist.pop(user_id_str)
-        self.save_blacklist()
+        self.index.discard(user_id)
         
         # Update roles if user is in server
         member = interaction.guild.get_member(user_id)
@@ -232,7 +198,7 @@ class CupidBlacklist(commands.Cog):
             await self.update_member_roles(member, False)
         
         # Get current user info for display
-        user_info = await self.get_user_info(user_id)
+        user_info = await self.get_user_info(user_id, interaction.guild)
         
         # Send confirmation
         embed = discord.Embed(
@@ -277,7 +243,7 @@ class CupidBlacklist(commands.Cog):
             return
         
         user_id_str = str(user_id)
-        user_info = await self.get_user_info(user_id)
+        user_info = await self.get_user_info(user_id, interaction.guild)
         
         if user_id_str in self.blacklist:
             data = self.blacklist[user_id_str]
@@ -318,6 +284,11 @@ class CupidBlacklist(commands.Cog):
         blacklist_entries = list(self.blacklist.items())
         embeds = []
         
+        # Live in-server status for everyone at once (one member chunk query per 100 unknown ids, no fetch_user)
+        live = await self.resolver.resolve_many(
+            [int(member_id) for member_id, _ in blacklist_entries], interaction.guild, fetch=False
+        )
+        
         for i in range(0, len(blacklist_entries), 10):
             embed = discord.Embed(
                 title="Blacklisted Users",
@@ -326,7 +297,7 @@ class CupidBlacklist(commands.Cog):
             )
             
             for member_id, data in blacklist_entries[i:i+10]:
-                status = "In Server" if data.get('is_in_server', False) else "Not in Server"
+                status = "In Server" if live[int(member_id)]['is_in_server'] else "Not in Server"
                 embed.add_field(
                     name=data['name'],
                     value=f"**Reason:** {data['reason']}\n**By:** {data['blacklisted_by']}\n**ID:** {member_id}\n**Status:** {status}",
@@ -342,17 +313,10 @@ class CupidBlacklist(commands.Cog):
     @commands.Cog.listener()
     async def on_message(self, message):
         """Prevent blacklisted members from posting in specified channels"""
-        if message.author.bot:
-            return
-        
-        # Check if message is in a blacklisted channel
-        if message.channel.id not in self.BLACKLISTED_CHANNELS:
-            return
-        
-        # Check if user is blacklisted
-        if str(message.author.id) in self.blacklist:
+        # Guarded channel + blacklisted user: two int-keyed lookups, no str() per message
+        if self.index.blocks(message.channel.id, message.author.id) and not message.author.bot:
             try:
-                await message.delete()
+                await self.outbound.delete(message, priority=MODERATION)
                 
                 # Send warning DM
                 try:
@@ -363,7 +327,7 @@ class CupidBlacklist(commands.Cog):
                     )
                     embed.add_field(name="Reason", value=self.blacklist[str(message.author.id)]['reason'], inline=False)
                     embed.add_field(name="Appeal", value="Contact a Cupid if you believe this is a mistake.", inline=False)
-                    await message.author.send(embed=embed)
+                    await self.outbound.send(message.author, embed=embed, priority=MODERATION)
                 except discord.Forbidden:
                     pass  # Can't DM user
                     
@@ -375,7 +339,7 @@ class CupidBlacklist(commands.Cog):
     @commands.Cog.listener()
     async def on_member_join(self, member):
         """Check if rejoining member was previously blacklisted"""
-        if str(member.id) in self.blacklist:
+        if member.id in self.index:
             # Re-apply blacklisted role if they rejoin
             await self.update_member_roles(member, True)
             print(f"Reapplied blacklist roles to rejoining member: {member.display_name}")
@@ -2,12 +2,14 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import random
+from utils.outbound import get_outbound, FUN
 
 class Fun(commands.Cog):
     """Fun and Social Commands"""
     
     def __init__(self, bot):
         self.bot = bot
+        self.outbound = get_outbound()
 
         # ===== SEKRET SYSTEM - MOVE THIS TO THE TOP =====
         self.sekret_users = set()  # Store user IDs being monitored
@@ -419,10 +421,7 @@ class Fun(commands.Cog):
         message = await interaction.original_response()
         reactions = ["💕", "🌸", "💥", "🎀", "✨", "💋"]
         for reaction in reactions[:3]:  # Add first 3 reactions
-            try:
-                await message.add_reaction(reaction)
-            except:
-                pass
+            self.outbound.react(message, reaction, priority=FUN)
 
     @blushandbang.error
     async def blushandbang_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
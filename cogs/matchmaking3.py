@@ -3,7 +3,8 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import google.generativeai as genai
+from google import genai
+from google.genai import types
 import re
 import difflib
 import math
@@ -13,6 +14,8 @@ import time
 import logging
 import asyncio
 from typing import Dict, List, Tuple, Optional
+from utils.prompt_cache import get_prompt_cache
+from utils.key_pool import get_key_pool
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -360,26 +363,46 @@ def detect_dealbreaker(pA: Dict, pB: Dict) -> Tuple[bool, Optional[str]]:
     return False, None
 
 # ---------------- HYBRID COG ----------------
+AI_MODEL_NAME = 'models/gemini-2.5-flash-lite'
+
+# Static instructions - sent once as system_instruction / cached content
+ANALYSIS_INSTRUCTIONS = """
+Analyze the romantic compatibility of the two profiles you are given.
+
+Task:
+1. Determine a "Nuance Score" (0-100) based on emotional vibe and shared specific interests.
+2. Write a 2-sentence "Emotional Summary" of why they match or don't.
+3. DO NOT provide icebreakers or advice.
+
+Output JSON only:
+{
+    "nuance_score": 0,
+    "summary": "text"
+}
+"""
+
 class Matchmaking(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        # Init Gemini Flash-Lite for high throughput analysis
-        api_key = os.getenv('AI_API_KEY')
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('models/gemini-2.5-flash-lite')
-        else:
-            self.model = None
+        # Gemini Flash-Lite for high throughput analysis, routed through the shared key pool
+        self.key_pool = get_key_pool()
+        if not self.key_pool:
             logger.warning("AI_API_KEY missing - F-35 Engine running in legacy mode.")
 
+    def generate_analysis(self, prompt: str):
+        """Blocking API call - cached instruction prefix when available, inline otherwise."""
+        with self.key_pool.lease() as key:
+            client = self.key_pool.client_for(key, genai.Client)
+            cache = get_prompt_cache(key, client, types)
+            return cache.generate(AI_MODEL_NAME, 'f35-analysis', ANALYSIS_INSTRUCTIONS, prompt,
+                                  response_mime_type="application/json")
+
     async def get_ai_analysis(self, p1: Dict, p2: Dict, algo_score: int) -> Dict:
         """Ask Gemini to analyze the vibe and nuance, excluding icebreakers."""
-        if not self.model:
+        if not self.key_pool:
             return {"nuance_score": 50, "summary": "AI Analysis Unavailable (Key Missing)"}
 
         prompt = f"""
-        Analyze the romantic compatibility of these two profiles.
-        
         Profile 1:
         Age: {p1.get('age')} | Gender: {p1.get('gender')}
         Interests: {', '.join(p1.get('likes', []) + p1.get('hobbies', []))}
@@ -391,23 +414,12 @@ class Matchmaking(commands.Cog):
         Traits: {', '.join(p2.get('traits', []))}
         
         Algorithmic Base Score: {algo_score}%
-        
-        Task:
-        1. Determine a "Nuance Score" (0-100) based on emotional vibe and shared specific interests.
-        2. Write a 2-sentence "Emotional Summary" of why they match or don't.
-        3. DO NOT provide icebreakers or advice.
-        
-        Output JSON only:
-        {{
-            "nuance_score": 0,
-            "summary": "text"
-        }}
         """
         
         try:
             response = await self.bot.loop.run_in_executor(
                 None, 
-                lambda: self.model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
+                lambda: self.generate_analysis(prompt)
             )
             return json.loads(response.text)
         except Exception as e:
@@ -14,6 +14,8 @@ import time
 import logging
 import asyncio
 from typing import Dict, List, Tuple, Optional
+from utils.prompt_cache import get_prompt_cache
+from utils.key_pool import get_key_pool
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -271,34 +273,40 @@ def compute_interest_score(list_a: List[str], list_b: List[str]) -> Tuple[float,
     return min(1.0, score_sum / denom), matches
 
 # ---------------- AI JUDGE (ANTI-YAP PROMPT) ----------------
+# STRICT ANTI-YAP PROMPT (static part - registered once as cached content when possible)
+MATCHMAKER_INSTRUCTIONS = """
+Role: Professional Matchmaker.
+Task: Rate compatibility (0-100).
+CRITICAL RULE: If gender/orientation conflict (e.g. 2 straight males), Score MUST be 0-10.
+
+Output exactly in this format. Max 3-4 sentences for REASON.
+SCORE: [number]
+REASON: [Short explanation]
+"""
+
+def generate_judgement(model: str, contents: str, safety):
+    """Blocking call: least loaded API key, cached instruction prefix if we have one, inline otherwise."""
+    pool = get_key_pool()
+    with pool.lease() as key:
+        client = pool.client_for(key, genai.Client)
+        cache = get_prompt_cache(key, client, types)
+        return cache.generate(model, "matchmaker", MATCHMAKER_INSTRUCTIONS, contents, safety_settings=safety)
+
 async def ask_athena_ai(p1_raw: str, p2_raw: str) -> Tuple[int, str]:
-    api_key = os.getenv("AI_API_KEY")
-    if not api_key: return 50, "AI Key missing - using math only."
+    if not get_key_pool(): return 50, "AI Key missing - using math only."
 
     CANDIDATE_MODELS = ["gemini-2.5-flash-lite", "gemini-2.0-flash", "gemini-1.5-pro"]
     safety = [types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="BLOCK_NONE")]
-    client = genai.Client(api_key=api_key)
     
-    # STRICT ANTI-YAP PROMPT
     prompt = f"""
-    Role: Professional Matchmaker.
-    Task: Rate compatibility (0-100).
-    CRITICAL RULE: If gender/orientation conflict (e.g. 2 straight males), Score MUST be 0-10.
-    
     P1: {p1_raw}
     P2: {p2_raw}
-    
-    Output exactly in this format. Max 3-4 sentences for REASON.
-    SCORE: [number]
-    REASON: [Short explanation]
     """
 
     loop = asyncio.get_running_loop()
     for model in CANDIDATE_MODELS:
         try:
-            res = await loop.run_in_executor(None, lambda: client.models.generate_content(
-                model=model, contents=prompt, config=types.GenerateContentConfig(safety_settings=safety)
-            ))
+            res = await loop.run_in_executor(None, lambda: generate_judgement(model, prompt, safety))
             if not res.text: continue
             text = res.text.strip()
             
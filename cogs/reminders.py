@@ -1,22 +1,76 @@
 import discord
 from discord.ext import commands, tasks
+import asyncio
+import os
 import time
 import re
-from collections import deque
+from utils.scheduler import HeapScheduler
+from utils.timing_wheel import TimingWheel
+from utils.reminder_store import ReminderStore
+from utils.reminder_index import ReminderIndex
+from utils.outbound import get_outbound, NOTIFY
+from utils.messages import split_lines
+from utils.recurrence import parse_recurrence, interval_of, next_fire, describe
+
+# Reminders that came due while the bot was down are sent in small, spaced-out batches
+CATCHUP_BATCH_SIZE = 25
+CATCHUP_BATCH_DELAY = 2  # seconds between batches
+
+# Recurring reminders can't fire more often than this
+MIN_RECURRING_INTERVAL = 300
 
 class Reminders(commands.Cog):
     """Reminder System"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.reminders = []
-        self.next_reminder_id = 1
+        self.reminders = ReminderIndex()  # by reminder id and by user id
+        self.max_reminders_per_user = int(os.getenv('REMINDER_MAX_PER_USER', '25'))
+        
+        # Min-heap keyed on reminder_time: we sleep exactly until the next one is due.
+        # REMINDER_BACKEND=wheel switches to the hierarchical timing wheel. It is NOT faster:
+        # at 200k reminders the heap ticks in ~0.5 µs vs ~5.7 µs, inserts in ~1.9 µs vs
+        # ~13.7 µs and uses ~145 vs ~189 B per reminder (bench_reminders.py). Keep the heap.
+        if os.getenv('REMINDER_BACKEND', 'heap') == 'wheel':
+            self.scheduler = TimingWheel()
+        else:
+            self.scheduler = HeapScheduler()
+        self.wakeup = asyncio.Event()
+        self.delivery_tasks = set()  # deliveries in progress, cancelled and awaited before the store closes
+        
+        # Sends go through the shared outbound queue (per-channel rate limits, 429 retries)
+        self.outbound = get_outbound()
+        
+        # Pending reminders survive restarts. Anything already overdue is delivered
+        # (marked late) once the bot is ready instead of going through the scheduler.
+        self.store = ReminderStore('reminders.db')
+        self.next_reminder_id = self.store.next_id()
+        self.missed_reminders = []
+        now = time.time()
+        for reminder in self.store.load_pending():
+            if reminder["reminder_time"] > now:
+                self.schedule(reminder, persist=False)
+            elif reminder["recurrence"]:
+                # Deliver the missed occurrence once, then carry on from the next one
+                self.missed_reminders.append(dict(reminder))
+                self.reschedule_recurring(reminder, now)
+            else:
+                self.missed_reminders.append(reminder)
         
         # Start the reminder background task
         self.check_reminders.start()
     
-    def cog_unload(self):
+    async def cog_unload(self):
         self.check_reminders.cancel()
+        for task in self.delivery_tasks:
+            task.cancel()
+        await asyncio.gather(*self.delivery_tasks, return_exceptions=True)
+        self.store.close()
+    
+    def spawn_delivery(self, coro):
+        task = self.bot.loop.create_task(coro)
+        self.delivery_tasks.add(task)
+        task.add_done_callback(self.delivery_tasks.discard)
     
     def parse_time(self, time_str):
         """Parse time string into seconds"""
@@ -59,33 +113,123 @@ class Reminders(commands.Cog):
         
         return ' '.join(time_parts)
     
-    @tasks.loop(seconds=30)
+    def schedule(self, reminder, persist=True):
+        """Track a reminder and wake the loop if it's due before whatever it's sleeping on"""
+        self.reminders.add(reminder)
+        if persist:
+            self.store.add(reminder)
+        next_due = self.scheduler.next_due()
+        self.scheduler.add(reminder["id"], reminder["reminder_time"])
+        if next_due is None or reminder["reminder_time"] < next_due:
+            self.wakeup.set()
+    
+    def reschedule_recurring(self, reminder, now):
+        """Move a recurring reminder to its next fire time (same id, same row)"""
+        reminder["reminder_time"] = next_fire(reminder["recurrence"], reminder["reminder_time"], now)
+        self.store.reschedule(reminder["id"], reminder["reminder_time"])
+        self.schedule(reminder, persist=False)
+    
+    def cancel(self, reminder_id):
+        """Forget a reminder (no need to wake the loop - it just finds nothing due)"""
+        self.scheduler.cancel(reminder_id)
+        self.store.delete(reminder_id)
+        return self.reminders.remove(reminder_id)
+    
+    def format_reminder(self, reminder, late=False):
+        mention = f"<@{reminder['user_id']}>"
+        if late:
+            due = int(reminder["reminder_time"])
+            return f"{mention} (late, was due <t:{due}:R>): {reminder['message']}"
+        return f"{mention}: {reminder['message']}"
+    
+    async def send_to_channel(self, channel_id, reminders, late=False):
+        """Send every due reminder for one channel in as few messages as possible"""
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            return
+        
+        if len(reminders) == 1:
+            reminder = reminders[0]
+            if late:
+                due = int(reminder["reminder_time"])
+                messages = [f"⏰ Late reminder for <@{reminder['user_id']}> (was due <t:{due}:R>, I was offline): {reminder['message']}"]
+            else:
+                messages = [f"⏰ Reminder for <@{reminder['user_id']}>: {reminder['message']}"]
+        else:
+            header = "⏰ **Late reminders** (I was offline)" if late else "⏰ **Reminders**"
+            messages = split_lines([self.format_reminder(r, late) for r in reminders], header=header)
+        
+        results = await asyncio.gather(
+            *(self.outbound.send(channel, content, priority=NOTIFY) for content in messages),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Error sending reminder: {result}")
+    
+    async def deliver(self, reminders, late=False):
+        """Group reminders by channel and send to all channels concurrently"""
+        by_channel = {}
+        for reminder in reminders:
+            by_channel.setdefault(reminder["channel_id"], []).append(reminder)
+        
+        await asyncio.gather(*(
+            self.send_to_channel(channel_id, channel_reminders, late)
+            for channel_id, channel_reminders in by_channel.items()
+        ))
+        
+        # Only drop them from disk once delivery was attempted, so a crash mid-send re-delivers late.
+        # Recurring reminders keep their row (already moved to the next fire time).
+        for reminder in reminders:
+            if not reminder.get("recurrence"):
+                self.store.delete(reminder["id"])
+    
+    async def deliver_missed_reminders(self):
+        """Catch up on reminders that came due while the bot was offline"""
+        missed, self.missed_reminders = self.missed_reminders, []
+        for i in range(0, len(missed), CATCHUP_BATCH_SIZE):
+            if i:
+                await asyncio.sleep(CATCHUP_BATCH_DELAY)
+            await self.deliver(missed[i:i + CATCHUP_BATCH_SIZE], late=True)
+        if missed:
+            print(f"Delivered {len(missed)} missed reminder(s)")
+    
+    @tasks.loop()
     async def check_reminders(self):
-        """Check and send reminders every 30 seconds"""
-        current_time = time.time()
-        reminders_to_remove = []
-        
-        for reminder in self.reminders:
-            if current_time >= reminder["reminder_time"]:
-                try:
-                    channel = self.bot.get_channel(reminder["channel_id"])
-                    user = self.bot.get_user(reminder["user_id"])
-                    if channel and user:
-                        await channel.send(f"⏰ Reminder for {user.mention}: {reminder['message']}")
-                    reminders_to_remove.append(reminder)
-                except Exception as e:
-                    print(f"Error sending reminder: {e}")
-                    reminders_to_remove.append(reminder)
-        
-        # Remove processed reminders
-        for reminder in reminders_to_remove:
-            if reminder in self.reminders:
-                self.reminders.remove(reminder)
+        """Sleep until the next reminder is due (or a sooner one is added), then send it"""
+        self.wakeup.clear()
+        next_due = self.scheduler.next_due()
+        
+        if next_due is None or next_due > time.time():
+            # Cap the sleep so a wall-clock jump can't leave us asleep for days
+            timeout = 300 if next_due is None else min(next_due - time.time(), 300)
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        
+        due = []
+        now = time.time()
+        for reminder_id in self.scheduler.pop_due(now):
+            reminder = self.reminders.remove(reminder_id)
+            if not reminder:
+                continue
+            if reminder.get("recurrence"):
+                due.append(dict(reminder))
+                self.reschedule_recurring(reminder, now)
+            else:
+                due.append(reminder)
+        
+        if due:
+            # Don't hold up the scheduler while a busy channel waits out its rate limit
+            self.spawn_delivery(self.deliver(due))
     
     @check_reminders.before_loop
     async def before_check_reminders(self):
         """Wait until bot is ready before starting reminder checks"""
         await self.bot.wait_until_ready()
+        if self.missed_reminders:
+            self.spawn_delivery(self.deliver_missed_reminders())
     
     @commands.command(name='remind', aliases=['reminder', 'timer'], 
                      help='Set a reminder. Usage: a.remind 1h30m Buy milk')
@@ -107,11 +251,21 @@ class Reminders(commands.Cog):
             `a.remind 2d12h Call mom`
             `a.remind 45 Take pizza out` (45 minutes)
             
+            **Recurring:**
+            `a.remind every 2h Drink water`
+            `a.remind every daily Journal`
+            `a.remind every mon,wed,fri@18:00 Gym` (UTC)
+            `a.remind every weekdays@8:30 Standup` (UTC)
+            
             **Time formats:** s (seconds), m (minutes), h (hours), d (days)
             """
             await ctx.send(help_text)
             return
         
+        if message.lower().startswith('every '):
+            await self.remind_every(ctx, message[6:].strip())
+            return
+        
         # Find the split between time and reminder text
         time_part = ''
         reminder_text = ''
@@ -153,18 +307,25 @@ class Reminders(commands.Cog):
             await ctx.send("𝑃𝑙𝑒𝑎𝑠𝑒 𝑠𝑒𝑡 𝑎 𝑟𝑒𝑚𝑖𝑛𝑑𝑒𝑟 𝑓𝑜𝑟 𝑎𝑡 𝑙𝑒𝑎𝑠𝑡 1 𝑚𝑖𝑛𝑢𝑡𝑒.")
             return
         
+        # Per-user cap so one person can't fill the scheduler
+        active = self.reminders.count_for_user(ctx.author.id)
+        if active >= self.max_reminders_per_user:
+            await ctx.send(f"𝑌𝑜𝑢 𝑎𝑙𝑟𝑒𝑎𝑑𝑦 ℎ𝑎𝑣𝑒 {active} 𝑎𝑐𝑡𝑖𝑣𝑒 𝑟𝑒𝑚𝑖𝑛𝑑𝑒𝑟𝑠 (𝑚𝑎𝑥 {self.max_reminders_per_user}). 𝑅𝑒𝑚𝑜𝑣𝑒 𝑜𝑛𝑒 𝑤𝑖𝑡ℎ `a.removereminder <ID>` 𝑓𝑖𝑟𝑠𝑡.")
+            return
+        
         reminder_time = time.time() + seconds
         
         # Add reminder to list with unique ID
         reminder_id = self.next_reminder_id
         self.next_reminder_id += 1
         
-        self.reminders.append({
+        self.schedule({
             "id": reminder_id,
             "user_id": ctx.author.id,
             "channel_id": ctx.channel.id,
             "reminder_time": reminder_time,
-            "message": reminder_text
+            "message": reminder_text,
+            "recurrence": None
         })
         
         # Calculate human-readable time
@@ -172,11 +333,48 @@ class Reminders(commands.Cog):
         
         await ctx.send(f"𝑅𝑒𝑚𝑖𝑛𝑑𝑒𝑟 #{reminder_id} 𝑠𝑒𝑡! 𝐼'𝑙𝑙 𝑟𝑒𝑚𝑖𝑛𝑑 𝑦𝑜𝑢 𝑖𝑛 {time_display}: {reminder_text}")
     
+    async def remind_every(self, ctx, spec):
+        """Create a recurring reminder: one record whose fire time moves forward on every delivery"""
+        spec_part, _, reminder_text = spec.partition(' ')
+        recurrence = parse_recurrence(spec_part)
+        if not recurrence:
+            await ctx.send("𝑃𝑙𝑒𝑎𝑠𝑒 𝑔𝑖𝑣𝑒 𝑎 𝑣𝑎𝑙𝑖𝑑 𝑟𝑒𝑝𝑒𝑎𝑡 (𝑒.𝑔. `2h`, `daily`, `mon,wed@18:00`) 𝑓𝑜𝑙𝑙𝑜𝑤𝑒𝑑 𝑏𝑦 𝑦𝑜𝑢𝑟 𝑟𝑒𝑚𝑖𝑛𝑑𝑒𝑟 𝑡𝑒𝑥𝑡.")
+            return
+        
+        interval = interval_of(recurrence)
+        if interval is not None and interval < MIN_RECURRING_INTERVAL:
+            await ctx.send("𝑅𝑒𝑐𝑢𝑟𝑟𝑖𝑛𝑔 𝑟𝑒𝑚𝑖𝑛𝑑𝑒𝑟𝑠 𝑐𝑎𝑛 𝑟𝑒𝑝𝑒𝑎𝑡 𝑎𝑡 𝑚𝑜𝑠𝑡 𝑒𝑣𝑒𝑟𝑦 5 𝑚𝑖𝑛𝑢𝑡𝑒𝑠.")
+            return
+        
+        active = self.reminders.count_for_user(ctx.author.id)
+        if active >= self.max_reminders_per_user:
+            await ctx.send(f"𝑌𝑜𝑢 𝑎𝑙𝑟𝑒𝑎𝑑𝑦 ℎ𝑎𝑣𝑒 {active} 𝑎𝑐𝑡𝑖𝑣𝑒 𝑟𝑒𝑚𝑖𝑛𝑑𝑒𝑟𝑠 (𝑚𝑎𝑥 {self.max_reminders_per_user}). 𝑅𝑒𝑚𝑜𝑣𝑒 𝑜𝑛𝑒 𝑤𝑖𝑡ℎ `a.removereminder <ID>` 𝑓𝑖𝑟𝑠𝑡.")
+            return
+        
+        reminder_text = reminder_text.strip() or "Reminder!"
+        now = time.time()
+        # Interval rules start one interval from now, weekday rules at their next matching slot
+        reminder_time = now + interval if interval is not None else next_fire(recurrence, now, now)
+        
+        reminder_id = self.next_reminder_id
+        self.next_reminder_id += 1
+        
+        self.schedule({
+            "id": reminder_id,
+            "user_id": ctx.author.id,
+            "channel_id": ctx.channel.id,
+            "reminder_time": reminder_time,
+            "message": reminder_text,
+            "recurrence": recurrence
+        })
+        
+        await ctx.send(f"𝑅𝑒𝑐𝑢𝑟𝑟𝑖𝑛𝑔 𝑟𝑒𝑚𝑖𝑛𝑑𝑒𝑟 #{reminder_id} 𝑠𝑒𝑡 ({describe(recurrence, self.format_time)})! 𝑁𝑒𝑥𝑡 𝑜𝑛𝑒 𝑖𝑛 {self.format_time(int(reminder_time - now))}: {reminder_text}")
+    
     @commands.command(name='reminders', aliases=['myreminders', 'listreminders'], 
                      help='List your active reminders')
     async def list_reminders(self, ctx):
         """List all active reminders for the user"""
-        user_reminders = [r for r in self.reminders if r["user_id"] == ctx.author.id]
+        user_reminders = self.reminders.for_user(ctx.author.id)
         
         if not user_reminders:
             await ctx.send("𝑌𝑜𝑢 𝑑𝑜𝑛'𝑡 ℎ𝑎𝑣𝑒 𝑎𝑛𝑦 𝑎𝑐𝑡𝑖𝑣𝑒 𝑟𝑒𝑚𝑖𝑛𝑑𝑒𝑟𝑠.")
@@ -189,6 +387,8 @@ class Reminders(commands.Cog):
                 continue
                 
             time_str = self.format_time(time_left)
+            if reminder.get("recurrence"):
+                time_str += f" (🔁 {describe(reminder['recurrence'], self.format_time)})"
             reminder_list.append(f"**#{reminder['id']}** - {time_str}: {reminder['message']}")
         
         if not reminder_list:
@@ -203,7 +403,7 @@ class Reminders(commands.Cog):
         """Remove a specific reminder by its ID"""
         if reminder_id is None:
             # Check if user has any reminders first
-            user_reminders = [r for r in self.reminders if r["user_id"] == ctx.author.id]
+            user_reminders = self.reminders.for_user(ctx.author.id)
             if not user_reminders:
                 await ctx.send("𝑌𝑜𝑢 𝑑𝑜𝑛'𝑡 ℎ𝑎𝑣𝑒 𝑎𝑛𝑦 𝑎𝑐𝑡𝑖𝑣𝑒 𝑟𝑒𝑚𝑖𝑛𝑑𝑒𝑟𝑠.")
                 return
@@ -218,16 +418,10 @@ class Reminders(commands.Cog):
                 await ctx.send(f"**𝑌𝑜𝑢𝑟 𝑎𝑐𝑡𝑖𝑣𝑒 𝑟𝑒𝑚𝑖𝑛𝑑𝑒𝑟𝑠:**\n" + "\n".join(reminder_list) + "\n\nUse `a.removereminder <ID>` to remove one.")
                 return
         
-        user_reminders = [r for r in self.reminders if r["user_id"] == ctx.author.id]
-        reminder_to_remove = None
-        
-        for reminder in user_reminders:
-            if reminder["id"] == reminder_id:
-                reminder_to_remove = reminder
-                break
+        reminder_to_remove = self.reminders.get(reminder_id)
         
-        if reminder_to_remove:
-            self.reminders.remove(reminder_to_remove)
+        if reminder_to_remove and reminder_to_remove["user_id"] == ctx.author.id:
+            self.cancel(reminder_id)
             await ctx.send(f"𝑅𝑒𝑚𝑖𝑛𝑑𝑒𝑟 #{reminder_id} ℎ𝑎𝑠 𝑏𝑒𝑒𝑛 𝑟𝑒𝑚𝑜𝑣𝑒𝑑.")
         else:
             await ctx.send(f"𝐶𝑜𝑢𝑙𝑑𝑛'𝑡 𝑓𝑖𝑛𝑑 𝑟𝑒𝑚𝑖𝑛𝑑𝑒𝑟 #{reminder_id}. 𝑈𝑠𝑒 `𝑎.𝑟𝑒𝑚𝑖𝑛𝑑𝑒𝑟𝑠` 𝑡𝑜 𝑠𝑒𝑒 𝑦𝑜𝑢𝑟 𝑎𝑐𝑡𝑖𝑣𝑒 𝑟𝑒𝑚𝑖𝑛𝑑𝑒𝑟𝑠.")
@@ -1,37 +1,436 @@
 import discord
 from discord.ext import commands, tasks
 import asyncio
+import time
+from utils.db import Database
+from utils.scheduler import HeapScheduler
+from utils.messages import split_lines
+from utils.outbound import get_outbound, NOTIFY
+from utils.vanity_matcher import VanityMatcher
+
+# Startup scan: members are checked in chunks (checkpointed after each one) and at most
+# ROLE_EDIT_CONCURRENCY role edits are in flight at a time
+SCAN_CHUNK_SIZE = 50
+ROLE_EDIT_CONCURRENCY = 4
+SCAN_REPORT_INTERVAL = 60  # seconds between progress DMs to the owner
+
+# Presence events for a member are collapsed into one check of the final state: it runs
+# PRESENCE_DEBOUNCE seconds after the last event (but never more than PRESENCE_DEBOUNCE_MAX
+# after the first). The role is only taken away once the vanity has been gone VANITY_GRACE_PERIOD.
+PRESENCE_DEBOUNCE = 10
+PRESENCE_DEBOUNCE_MAX = 60
+VANITY_GRACE_PERIOD = 300
+
+VANITY_INFO_PAGE_SIZE = 25
+
+# New reps are announced in batches: one member keeps the usual embed, several share a digest
+ANNOUNCE_WINDOW = 10
+
+VANITY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vanity_state (
+    guild_id INTEGER NOT NULL,
+    member_id INTEGER NOT NULL,
+    since REAL,
+    last_announced REAL,
+    PRIMARY KEY (guild_id, member_id)
+);
+-- Resuming a scan recomputes the diff, so all we keep is how many edits were already applied
+DROP TABLE IF EXISTS scan_checkpoint;
+CREATE TABLE IF NOT EXISTS scan_progress (
+    guild_id INTEGER PRIMARY KEY,
+    applied INTEGER NOT NULL
+);
+"""
+
+class VanityState:
+    """A member's vanity status: when the current rep started (None = not repping) and the last announcement"""
+    __slots__ = ("since", "last_announced")
+    
+    def __init__(self, since=None, last_announced=None):
+        self.since = since
+        self.last_announced = last_announced
+
+class VanityInfoView(discord.ui.View):
+    """Pages through the cached vanity holder snapshot; each page is only rendered when shown"""
+    
+    def __init__(self, cog, guild, author_id):
+        super().__init__(timeout=180)
+        self.cog = cog
+        self.guild = guild
+        self.author_id = author_id
+        self.page = 0
+        self.message = None
+    
+    def render(self):
+        holders = self.cog.holder_snapshot(self.guild)
+        pages = max(1, -(-len(holders) // VANITY_INFO_PAGE_SIZE))
+        self.page = min(self.page, pages - 1)
+        start = self.page * VANITY_INFO_PAGE_SIZE
+        
+        embed = discord.Embed(
+            title="𝑉𝑎𝑛𝑖𝑡𝑦 𝑅𝑜𝑙𝑒 𝑀𝑒𝑚𝑏𝑒𝑟𝑠",
+            description=f"{len(holders)} members repping /cheriies",
+            color=0xffffff
+        )
+        member_list = []
+        for member_id in holders[start:start + VANITY_INFO_PAGE_SIZE]:
+            member = self.guild.get_member(member_id)
+            if member:
+                status_emoji = "🟢" if member.status != discord.Status.offline else "⚫"
+                member_list.append(f"{status_emoji} {member.mention}")
+        embed.add_field(name="Members", value="\n".join(member_list) or "None", inline=False)
+        embed.set_footer(text=f"Page {self.page + 1}/{pages}")
+        
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= pages - 1
+        return embed
+    
+    async def interaction_check(self, interaction):
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Run `a.vanityinfo` yourself to browse the list~", ephemeral=True)
+            return False
+        return True
+    
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction, button):
+        self.page = max(0, self.page - 1)
+        await interaction.response.edit_message(embed=self.render(), view=self)
+    
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction, button):
+        self.page += 1
+        await interaction.response.edit_message(embed=self.render(), view=self)
+    
+    async def on_timeout(self):
+        if self.message:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
 
 class Vanity(commands.Cog):
     """Vanity URL Tracking System"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.vanity_urls = ["/cheriies", "/Cheriies", "discord.gg/Cheriies", "discord.gg/cheriies"]
+        # One compiled, case-insensitive pattern (VANITY_URLS env or a.vanityurls to change the list)
+        self.matcher = VanityMatcher.from_env()
         self.vanity_role_id = 1376492245448130651
         self.vanity_announcement_channel_id = 1400515374977650799
         self.vanity_embed_image = "https://i.pinimg.com/1200x/cb/38/25/cb382553542ef736d455d377bf8592e1.jpg"
-        self.vanity_tracking = {}
+        self.outbound = get_outbound()
+        
+        # Role edits share one small pool; a 429 pauses every edit until the limit resets
+        self.role_edit_pool = asyncio.Semaphore(ROLE_EDIT_CONCURRENCY)
+        self.paused_until = 0.0
+        self.scan_progress = None  # dict while the startup scan runs
+        self.owner = None
+        
+        # Debounced presence checks and vanity-absence timers, both keyed on (guild_id, member_id)
+        self.pending_checks = HeapScheduler()
+        self.first_event = {}    # key -> time of the first event in the current burst
+        self.absent_since = {}   # key -> when a role holder's vanity went missing
+        self.wakeup = asyncio.Event()
+        
+        # Sorted holder ids per guild for a.vanityinfo; dropped whenever someone gains/loses the role
+        self.holder_snapshots = {}
+        
+        self.announce_buffer = {}  # member_id -> member, flushed ANNOUNCE_WINDOW after the first
+        self.announce_task = None
+        
+        # Vanity state and scan checkpoints survive restarts: nobody is re-announced, and an
+        # interrupted scan resumes where it stopped
+        self.db = Database('vanity.db', VANITY_SCHEMA)
+        self.vanity_state = {}  # (guild_id, member_id) -> VanityState
+        for guild_id, member_id, since, last_announced in self.db.query_sync(
+            "SELECT guild_id, member_id, since, last_announced FROM vanity_state"
+        ):
+            self.vanity_state[(guild_id, member_id)] = VanityState(since, last_announced)
         
         # Start checking existing members on ready
         self.check_existing_members.start()
+        self.vanity_timer.start()
     
-    def cog_unload(self):
-        self.check_existing_members.cancel()
+    async def cog_unload(self):
+        # Stop the scan, the timer and the announcement flush, and wait for them before closing the db
+        pending = []
+        for loop in (self.check_existing_members, self.vanity_timer):
+            loop.cancel()
+            pending.append(loop.get_task())
+        if self.announce_task is not None:
+            self.announce_task.cancel()
+            pending.append(self.announce_task)
+        await asyncio.gather(*(task for task in pending if task is not None), return_exceptions=True)
+        self.db.close()
     
     @tasks.loop(count=1)
     async def check_existing_members(self):
-        """Check all existing members for vanity URLs on startup"""
+        """Reconcile the vanity role in every guild on startup (in the background, resumable)"""
         await self.bot.wait_until_ready()
         
         for guild in self.bot.guilds:
-            for member in guild.members:
-                if member.bot:
-                    continue
-                await self.check_vanity_url(member, force_check=True)
+            if guild.get_role(self.vanity_role_id):
+                await self.scan_guild(guild)
     
-    async def check_vanity_url(self, member, force_check=False, is_presence_update=False):
-        """Check if a member has vanity URL in their activities and manage role"""
+    def queue_check(self, member):
+        """(Re)arm the member's pending check; a burst of events ends up as one evaluation"""
+        key = (member.guild.id, member.id)
+        now = time.time()
+        first = self.first_event.setdefault(key, now)
+        self.schedule_check(key, min(now + PRESENCE_DEBOUNCE, first + PRESENCE_DEBOUNCE_MAX))
+    
+    def schedule_check(self, key, due):
+        next_due = self.pending_checks.next_due()
+        self.pending_checks.add(key, due)
+        if next_due is None or due < next_due:
+            self.wakeup.set()
+    
+    @tasks.loop()
+    async def vanity_timer(self):
+        """Sleep until the next debounced check is due, then evaluate those members as they are now"""
+        self.wakeup.clear()
+        next_due = self.pending_checks.next_due()
+        if next_due is None or next_due > time.time():
+            timeout = 3600 if next_due is None else min(next_due - time.time(), 3600)
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        
+        members = []
+        for key in self.pending_checks.pop_due(time.time()):
+            self.first_event.pop(key, None)
+            guild = self.bot.get_guild(key[0])
+            member = guild.get_member(key[1]) if guild else None
+            if member:
+                members.append(member)
+        
+        results = await asyncio.gather(
+            *(self.check_vanity_url(member) for member in members),
+            return_exceptions=True
+        )
+        for member, result in zip(members, results):
+            if isinstance(result, Exception):
+                print(f"Vanity check failed for {member.display_name}: {result}")
+    
+    @vanity_timer.before_loop
+    async def before_vanity_timer(self):
+        await self.bot.wait_until_ready()
+    
+    def has_vanity(self, member):
+        """Whether any of the member's activities mention a vanity URL"""
+        return self.matcher.check(member.id, member.activities)
+    
+    def vanity_diff(self, guild):
+        """(role, to_add, to_remove) from two sets: members repping the vanity and current role holders"""
+        vanity_role = guild.get_role(self.vanity_role_id)
+        if not vanity_role:
+            return None, set(), set()
+        
+        holders = {member for member in vanity_role.members if not member.bot}
+        repping = {member for member in guild.members if not member.bot and self.has_vanity(member)}
+        
+        to_add = repping - holders
+        # Offline members show no activities at all, so there's nothing to judge them on - they keep the
+        # role unless the saved state says they had already stopped repping
+        to_remove = {
+            member for member in holders - repping
+            if member.status != discord.Status.offline or self.is_repping(member) is False
+        }
+        return vanity_role, to_add, to_remove
+    
+    def is_repping(self, member):
+        """Saved state: True/False, or None if we've never seen this member"""
+        state = self.vanity_state.get((member.guild.id, member.id))
+        return None if state is None else state.since is not None
+    
+    def save_state(self, key, state):
+        self.db.submit(
+            "INSERT OR REPLACE INTO vanity_state (guild_id, member_id, since, last_announced) VALUES (?, ?, ?, ?)",
+            (key[0], key[1], state.since, state.last_announced)
+        )
+    
+    def start_rep(self, member, announced=False):
+        """Record that the member reps the vanity; True if this rep hasn't been announced yet"""
+        key = (member.guild.id, member.id)
+        state = self.vanity_state.get(key)
+        if state is None:
+            state = self.vanity_state[key] = VanityState()
+        now = time.time()
+        if state.since is None:
+            state.since = now
+        if announced:
+            state.last_announced = now
+        
+        due = state.last_announced is None or state.last_announced < state.since
+        if due:
+            # Claimed before the send so a concurrent check can't announce the same rep twice
+            state.last_announced = now
+        self.save_state(key, state)
+        return due
+    
+    def end_rep(self, member):
+        self.announce_buffer.pop(member.id, None)
+        key = (member.guild.id, member.id)
+        state = self.vanity_state.get(key)
+        if state is not None and state.since is not None:
+            state.since = None
+            self.save_state(key, state)
+    
+    def backfill_state(self, vanity_role):
+        """Holders that are repping but have no saved state (role given before the state table existed)"""
+        for member in vanity_role.members:
+            if not member.bot and self.is_repping(member) is None and self.has_vanity(member):
+                self.start_rep(member, announced=True)
+    
+    async def scan_guild(self, guild):
+        """Apply the role diff SCAN_CHUNK_SIZE edits at a time, recording progress after each chunk.
+
+        Resuming after a restart means recomputing the diff: edits applied before it simply drop
+        out, so only the number already applied is kept (for the progress message).
+        """
+        rows = await self.db.query("SELECT applied FROM scan_progress WHERE guild_id = ?", (guild.id,))
+        applied_before = rows[0][0] if rows else 0
+        vanity_role, to_add, to_remove = self.vanity_diff(guild)
+        self.backfill_state(vanity_role)
+        changes = sorted(
+            [(member, True) for member in to_add] + [(member, False) for member in to_remove],
+            key=lambda change: change[0].id
+        )
+        
+        progress = self.scan_progress = dict(
+            guild=guild.name, checked=0, total=len(changes), added=0, removed=0,
+            holders=sum(1 for m in vanity_role.members if not m.bot)
+        )
+        if rows:
+            await self.report(
+                f"🔄 Resuming vanity scan of **{guild.name}** ({applied_before} edits were applied before the restart, "
+                f"{len(changes)} left)"
+            )
+        last_report = time.monotonic()
+        
+        try:
+            for i in range(0, len(changes), SCAN_CHUNK_SIZE):
+                chunk = changes[i:i + SCAN_CHUNK_SIZE]
+                results = await asyncio.gather(
+                    *(self.apply_change(member, vanity_role, add) for member, add in chunk),
+                    return_exceptions=True
+                )
+                for (member, add), result in zip(chunk, results):
+                    if isinstance(result, Exception):
+                        print(f"Vanity role update failed for {member.display_name}: {result}")
+                    elif add:
+                        progress['added'] += 1
+                        progress['holders'] += 1
+                    else:
+                        progress['removed'] += 1
+                        progress['holders'] -= 1
+                progress['checked'] += len(chunk)
+                
+                self.db.submit(
+                    "INSERT OR REPLACE INTO scan_progress (guild_id, applied) VALUES (?, ?)",
+                    (guild.id, applied_before + progress['checked'])
+                )
+                
+                if time.monotonic() - last_report >= SCAN_REPORT_INTERVAL:
+                    last_report = time.monotonic()
+                    await self.report(
+                        f"🔄 Vanity scan of **{guild.name}**: {progress['checked']}/{progress['total']} role edits, "
+                        f"{progress['holders']} repping"
+                    )
+        finally:
+            self.scan_progress = None
+        
+        self.db.submit("DELETE FROM scan_progress WHERE guild_id = ?", (guild.id,))
+        await self.report(
+            f"✅ Vanity scan of **{guild.name}** done: +{progress['added']} / -{progress['removed']}, "
+            f"{progress['holders']} repping"
+        )
+    
+    async def apply_change(self, member, vanity_role, add):
+        await self.edit_role(member, vanity_role, add)
+        if not add:
+            self.end_rep(member)
+        elif self.start_rep(member):
+            self.announce(member)
+    
+    def announce(self, member):
+        """Queue a welcome for a new vanity rep; everyone queued within ANNOUNCE_WINDOW goes out together"""
+        self.announce_buffer[member.id] = member
+        if self.announce_task is None or self.announce_task.done():
+            self.announce_task = asyncio.ensure_future(self.flush_announcements())
+    
+    async def flush_announcements(self):
+        await asyncio.sleep(ANNOUNCE_WINDOW)
+        members, self.announce_buffer = list(self.announce_buffer.values()), {}
+        
+        announcement_channel = self.bot.get_channel(self.vanity_announcement_channel_id)
+        if not announcement_channel or not members:
+            return
+        
+        if len(members) == 1:
+            embed = discord.Embed(
+                title="𝐴𝑛 𝐴𝑛𝑔𝑒𝑙 𝐻𝑎𝑠 𝐺𝑎𝑖𝑛𝑒𝑑 𝐼𝑡𝑠 𝑊𝑖𝑛𝑔𝑠..",
+                description=f"𝑇ℎ𝑎𝑛𝑘 𝑦𝑜𝑢 {members[0].mention} 𝑓𝑜𝑟 𝑟𝑒𝑝𝑝𝑖𝑛𝑔 /𝗰𝗵𝗲𝗿𝗶𝗶𝗲𝘀 ♡ 𓂃 𝑖𝑛 𝑦𝑜𝑢𝑟 𝑠𝑡𝑎𝑡𝑢𝑠 . . . <#1400815717506617494>",
+                color=0xffffff
+            )
+            embed.set_image(url=self.vanity_embed_image)
+            embed.set_footer(text="")
+            self.outbound.send(announcement_channel, embed=embed, priority=NOTIFY)
+            return
+        
+        header = f"𝑇ℎ𝑎𝑛𝑘 𝑦𝑜𝑢 𝑓𝑜𝑟 𝑟𝑒𝑝𝑝𝑖𝑛𝑔 /𝗰𝗵𝗲𝗿𝗶𝗶𝗲𝘀 ♡ 𓂃 𝑖𝑛 𝑦𝑜𝑢𝑟 𝑠𝑡𝑎𝑡𝑢𝑠 . . . <#1400815717506617494>\n"
+        for description in split_lines([f"♡ {member.mention}" for member in members], header=header, limit=4096):
+            embed = discord.Embed(
+                title=f"{len(members)} 𝐴𝑛𝑔𝑒𝑙𝑠 𝐻𝑎𝑣𝑒 𝐺𝑎𝑖𝑛𝑒𝑑 𝑇ℎ𝑒𝑖𝑟 𝑊𝑖𝑛𝑔𝑠..",
+                description=description,
+                color=0xffffff
+            )
+            embed.set_image(url=self.vanity_embed_image)
+            self.outbound.send(announcement_channel, embed=embed, priority=NOTIFY)
+    
+    async def report(self, text):
+        """Progress note for the bot owner (console + DM)"""
+        print(text)
+        if self.owner is None:
+            try:
+                self.owner = (await self.bot.application_info()).owner
+            except discord.HTTPException:
+                return
+        self.outbound.send(self.owner, text, priority=NOTIFY)
+    
+    async def edit_role(self, member, role, add):
+        """Add/remove a role through the shared pool, waiting out (and reporting) rate limits"""
+        async with self.role_edit_pool:
+            for attempt in range(3):
+                wait = self.paused_until - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                try:
+                    if add:
+                        await member.add_roles(role)
+                    else:
+                        await member.remove_roles(role)
+                    return
+                except discord.HTTPException as e:
+                    if e.status != 429 or attempt == 2:
+                        raise
+                    self.pause(getattr(e, 'retry_after', None) or 5)
+    
+    def pause(self, seconds):
+        """Hold every role edit for `seconds` (after a 429)"""
+        until = time.monotonic() + seconds
+        if until <= self.paused_until:
+            return
+        self.paused_until = until
+        if self.scan_progress:
+            asyncio.ensure_future(self.report(
+                f"⏸️ Vanity scan paused for {seconds:.0f}s (rate limited) at "
+                f"{self.scan_progress['checked']}/{self.scan_progress['total']}"
+            ))
+    
+    async def check_vanity_url(self, member):
+        """Check a member's activities after a presence update and add / remove the role"""
         if member.bot:
             return False
         
@@ -39,47 +438,33 @@ class Vanity(commands.Cog):
         if not vanity_role:
             return False
         
-        # Skip checking presence updates for offline members (but still allow manual checks)
-        if member.status == discord.Status.offline and not force_check:
+        key = (member.guild.id, member.id)
+        # Offline members have no activities to check (the scan and a.checkvanity use vanity_diff)
+        if member.status == discord.Status.offline:
+            # Going offline hides activities, so a removal pending its grace period is dropped:
+            # offline holders keep the role, and the next presence update starts a fresh one
+            self.clear_absence(key)
             # If they already have the role and we've verified it before, keep it
-            if vanity_role in member.roles and self.vanity_tracking.get(member.id):
+            if vanity_role in member.roles and self.is_repping(member):
                 return True
             return False
         
         # Check for vanity URLs in activities
-        has_vanity = False
-        if member.activities:
-            for activity in member.activities:
-                if activity.name and any(url in activity.name for url in self.vanity_urls):
-                    has_vanity = True
-                    break
-                if hasattr(activity, 'details') and activity.details and any(url in activity.details for url in self.vanity_urls):
-                    has_vanity = True
-                    break
-                if hasattr(activity, 'state') and activity.state and any(url in activity.state for url in self.vanity_urls):
-                    has_vanity = True
-                    break
+        has_vanity = self.has_vanity(member)
         
         has_role = vanity_role in member.roles
+        if has_vanity or not has_role:
+            # Only a holder whose URL is missing can have a removal pending
+            self.clear_absence(key)
         
         if has_vanity and not has_role:
             # Add role and send announcement
             try:
-                await member.add_roles(vanity_role)
-                self.vanity_tracking[member.id] = True
+                await self.edit_role(member, vanity_role, add=True)
                 
-                # Send announcement only if this is a new detection
-                announcement_channel = self.bot.get_channel(self.vanity_announcement_channel_id)
-                if announcement_channel:
-                    embed = discord.Embed(
-                        title="𝐴𝑛 𝐴𝑛𝑔𝑒𝑙 𝐻𝑎𝑠 𝐺𝑎𝑖𝑛𝑒𝑑 𝐼𝑡𝑠 𝑊𝑖𝑛𝑔𝑠..",
-                        description=f"𝑇ℎ𝑎𝑛𝑘 𝑦𝑜𝑢 {member.mention} 𝑓𝑜𝑟 𝑟𝑒𝑝𝑝𝑖𝑛𝑔 /𝗰𝗵𝗲𝗿𝗶𝗶𝗲𝘀 ♡ 𓂃 𝑖𝑛 𝑦𝑜𝑢𝑟 𝑠𝑡𝑎𝑡𝑢𝑠 . . . <#1400815717506617494>",
-                        color=0xffffff
-                    )
-                    embed.set_image(url=self.vanity_embed_image)
-                    embed.set_footer(text="")
-                    
-                    await announcement_channel.send(embed=embed)
+                # Send announcement only if this rep hasn't been announced yet (even across restarts)
+                if self.start_rep(member):
+                    self.announce(member)
                 return True
                 
             except discord.Forbidden:
@@ -87,20 +472,30 @@ class Vanity(commands.Cog):
                 return False
         
         elif not has_vanity and has_role:
-            # Remove role if they genuinely removed the vanity URL
-            # But only if this is a real presence update (not just going offline)
-            # OR if it's a manual force check
-            if force_check or (is_presence_update and member.status != discord.Status.offline):
-                try:
-                    await member.remove_roles(vanity_role)
-                    self.vanity_tracking[member.id] = False
-                    return False
-                except discord.Forbidden:
-                    print(f"Missing permissions to remove vanity role from {member.display_name}")
-                    return True
+            # Hysteresis: the URL has to stay gone for VANITY_GRACE_PERIOD, so a status that
+            # flickers off and back on doesn't cost the role. The recheck scheduled for the end
+            # of the grace period comes back through here and removes it.
+            now = time.time()
+            since = self.absent_since.setdefault(key, now)
+            if now - since < VANITY_GRACE_PERIOD:
+                self.schedule_check(key, since + VANITY_GRACE_PERIOD)
+                return True
+            self.absent_since.pop(key, None)
+            try:
+                await self.edit_role(member, vanity_role, add=False)
+                self.end_rep(member)
+                return False
+            except discord.Forbidden:
+                print(f"Missing permissions to remove vanity role from {member.display_name}")
+                return True
         
         return has_role
     
+    def clear_absence(self, key):
+        """Drop a pending grace-period removal and its recheck"""
+        if self.absent_since.pop(key, None) is not None:
+            self.pending_checks.cancel(key)
+    
     @commands.Cog.listener()
     async def on_presence_update(self, before, after):
         """Check when a user updates their presence"""
@@ -109,7 +504,7 @@ class Vanity(commands.Cog):
         
         # Only check if this is a meaningful presence update (not just going offline)
         if after.status != discord.Status.offline or before.activities != after.activities:
-            await self.check_vanity_url(after, is_presence_update=True)
+            self.queue_check(after)
     
     @commands.Cog.listener()
     async def on_member_update(self, before, after):
@@ -117,63 +512,113 @@ class Vanity(commands.Cog):
         if before.bot:
             return
         
+        had_role = before.get_role(self.vanity_role_id) is not None
+        has_role = after.get_role(self.vanity_role_id) is not None
+        if had_role != has_role or (has_role and before.display_name != after.display_name):
+            self.holder_snapshots.pop(after.guild.id, None)
+        
         # Check if activities might have changed
         if before.activities != after.activities or before.display_name != after.display_name:
-            await self.check_vanity_url(after, is_presence_update=True)
+            self.queue_check(after)
+    
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        if member.get_role(self.vanity_role_id) is not None:
+            self.holder_snapshots.pop(member.guild.id, None)
+        key = (member.guild.id, member.id)
+        self.matcher.forget(member.id)
+        self.pending_checks.cancel(key)
+        self.first_event.pop(key, None)
+        self.absent_since.pop(key, None)
+        self.end_rep(member)
     
-    @commands.command(name='checkvanity', aliases=['vanitycheck'], help='Manually check for vanity URL reps (Admin only)')
+    @commands.command(name='checkvanity', aliases=['vanitycheck'], help='Manually check for vanity URL reps (Admin only). Add "dry" to preview the changes')
     @commands.has_permissions(administrator=True)
-    async def check_vanity_command(self, ctx):
+    async def check_vanity_command(self, ctx, mode: str = None):
         """Manual check for vanity URL representations"""
-        message = await ctx.send("🔄 Checking all members for vanity URLs...")
+        vanity_role, to_add, to_remove = self.vanity_diff(ctx.guild)
+        if not vanity_role:
+            await ctx.send("Vanity role not configured.")
+            return
+        
+        if mode and mode.lower() in ('dry', 'dryrun', 'dry-run', 'preview'):
+            lines = [f"➕ {member.mention}" for member in sorted(to_add, key=lambda m: m.display_name.lower())]
+            lines += [f"➖ {member.mention}" for member in sorted(to_remove, key=lambda m: m.display_name.lower())]
+            header = f"**Vanity dry run:** {len(to_add)} to add, {len(to_remove)} to remove (no roles changed)"
+            for content in split_lines(lines, header=header) or [header]:
+                await ctx.send(content, allowed_mentions=discord.AllowedMentions.none())
+            return
+        
+        message = await ctx.send(f"🔄 Updating vanity role: {len(to_add)} to add, {len(to_remove)} to remove...")
         
-        count = 0
-        for member in ctx.guild.members:
-            if member.bot:
-                continue
-            
-            result = await self.check_vanity_url(member, force_check=True)
-            if result:
-                count += 1
+        changes = [(member, True) for member in to_add] + [(member, False) for member in to_remove]
+        holders = {member for member in vanity_role.members if not member.bot}
+        results = await asyncio.gather(
+            *(self.apply_change(member, vanity_role, add) for member, add in changes),
+            return_exceptions=True
+        )
+        # The role cache only catches up when the gateway echoes the edits, so count from the diff
+        count = len(holders)
+        failed = 0
+        for (member, add), result in zip(changes, results):
+            if isinstance(result, Exception):
+                failed += 1
+                print(f"Vanity role update failed for {member.display_name}: {result}")
+            elif (member in holders) != add:
+                count += 1 if add else -1
         
-        await message.edit(content=f"Vanity check complete! {count} members have the vanity role.")
+        await message.edit(
+            content=f"Vanity check complete! {count} members have the vanity role."
+            + (f" ({failed} role update(s) failed)" if failed else "")
+        )
+    
+    @commands.command(name='vanityurls', help='List, add or remove the vanity URLs that count as repping (Admin only)')
+    @commands.has_permissions(administrator=True)
+    async def vanity_urls_command(self, ctx, action: str = None, *, url: str = None):
+        """a.vanityurls | a.vanityurls add <url> | a.vanityurls remove <url> (matching ignores case)"""
+        urls = list(self.matcher.urls)
+        if action in ('add', 'remove') and url:
+            if action == 'add':
+                urls.append(url)
+            elif url.strip().lower() in urls:
+                urls.remove(url.strip().lower())
+            self.matcher.set_urls(urls)
+        elif action is not None:
+            await ctx.send("Use `a.vanityurls`, `a.vanityurls add <url>` or `a.vanityurls remove <url>`.")
+            return
+        
+        listed = ", ".join(f"`{u}`" for u in self.matcher.urls) or "none"
+        await ctx.send(f"Vanity URLs: {listed}")
+    
+    def holder_snapshot(self, guild):
+        """Vanity holder ids sorted by display name, rebuilt only after a role change"""
+        snapshot = self.holder_snapshots.get(guild.id)
+        if snapshot is None:
+            vanity_role = guild.get_role(self.vanity_role_id)
+            holders = [member for member in vanity_role.members if not member.bot] if vanity_role else []
+            holders.sort(key=lambda member: member.display_name.casefold())
+            snapshot = self.holder_snapshots[guild.id] = [member.id for member in holders]
+        return snapshot
     
     @commands.command(name='vanityinfo', aliases=['vanityusers'], help='Show members with vanity role')
     async def vanity_info(self, ctx):
-        """Show information about vanity role members"""
+        """Show information about vanity role members (paginated)"""
         vanity_role = ctx.guild.get_role(self.vanity_role_id)
         if not vanity_role:
             await ctx.send("Vanity role not configured.")
             return
         
-        members_with_role = [member for member in vanity_role.members if not member.bot]
-        
-        if not members_with_role:
+        if not self.holder_snapshot(ctx.guild):
             await ctx.send("No members currently have the vanity role.")
             return
         
-        # Create embed with member list
-        embed = discord.Embed(
-            title="𝑉𝑎𝑛𝑖𝑡𝑦 𝑅𝑜𝑙𝑒 𝑀𝑒𝑚𝑏𝑒𝑟𝑠",
-            description=f"{len(members_with_role)} members repping /cheriies",
-            color=0xffffff
-        )
-        
-        member_list = []
-        for member in members_with_role[:25]:  # Limit to first 25 members
-            status_emoji = "🟢" if member.status != discord.Status.offline else "⚫"
-            member_list.append(f"{status_emoji} {member.mention}")
-        
-        embed.add_field(
-            name="Members", 
-            value="\n".join(member_list) if member_list else "None",
-            inline=False
-        )
-        
-        if len(members_with_role) > 25:
-            embed.set_footer(text=f"And {len(members_with_role) - 25} more members...")
-        
-        await ctx.send(embed=embed)
+        view = VanityInfoView(self, ctx.guild, ctx.author.id)
+        embed = view.render()
+        if view.next_page.disabled:
+            # Everything fits on one page - no buttons needed
+            await ctx.send(embed=embed)
+            return
+        view.message = await ctx.send(embed=embed, view=view)
 
 async def setup(bot):
     await bot.add_cog(Vanity(bot))
\ No newline at end of file
@@ -3,6 +3,7 @@ import sys
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
+from utils.outbound import get_outbound, FUN
 
 # Load environment variables
 load_dotenv()
@@ -100,11 +101,9 @@ async def on_message(message):
         return
     
     # 1. Check for autoreaction in designated channels
+    # (queued at the lowest priority; failures such as missing permissions are logged by the queue)
     if message.channel.id in AUTO_REACTION_CHANNELS:
-        try:
-            await message.add_reaction(AUTO_REACTION_EMOJI)
-        except discord.errors.Forbidden:
-            print(f"Error: Lack permissions to add reactions in #{message.channel.name}")
+        get_outbound().react(message, AUTO_REACTION_EMOJI, priority=FUN)
     
     # 2. Process commands (this allows the AFK system in the cog to work)
     await bot.process_commands(message)
@@ -155,6 +154,18 @@ async def help_command(ctx):
     
     await ctx.send(embed=embed)
 
+@bot.command(name='outbound', help='Show the outbound message queue (Owner only)')
+@commands.is_owner()
+async def outbound_stats(ctx):
+    """Queue depth, wait times and counters for the shared send queue"""
+    stats = get_outbound().stats()
+    depth = ", ".join(f"{name} {count}" for name, count in stats['depth_by_priority'].items())
+    await ctx.send(
+        f"**Outbound queue**: {stats['depth']} pending ({depth}), {stats['in_flight']} in flight\n"
+        f"Wait: avg {stats['wait_avg']:.2f}s | p95 {stats['wait_p95']:.2f}s | max {stats['wait_max']:.2f}s\n"
+        f"Sent: {stats['sent']} | Failed: {stats['failed']} | Coalesced: {stats['coalesced']} | Retried after 429: {stats['retried']}"
+    )
+
 # Ping command (since it's not in any cog)
 @bot.command(name='ping', aliases=['p'], help='Responds with Pong! and latency')
 async def ping(ctx):
@@ -1,17 +1,18 @@
-import os
 import google.generativeai as genai
 from dotenv import load_dotenv
+from utils.key_pool import KeyPool
 
 load_dotenv() # Load the .env file
-API_KEY = os.getenv('AI_API_KEY') # Get the key
+pool = KeyPool.from_env() # Get the key(s)
 
-print(f"Testing API Key: {API_KEY}")
+for key in pool.keys:
+    print(f"Testing API Key {key.name}: …{key.value[-4:]}")
 
-genai.configure(api_key=API_KEY)
-model = genai.GenerativeModel('gemini-1.5-flash')
+    genai.configure(api_key=key.value)
+    model = genai.GenerativeModel('gemini-1.5-flash')
 
-try:
-    response = model.generate_content("Hello, are you operational?")
-    print("SUCCESS! Response:", response.text)
-except Exception as e:
-    print("FAILED! Error:", e)
\ No newline at end of file
+    try:
+        response = model.generate_content("Hello, are you operational?")
+        print("SUCCESS! Response:", response.text)
+    except Exception as e:
+        print("FAILED! Error:", e)
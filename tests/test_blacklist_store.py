@@ -0,0 +1,24 @@
+import json
+
+from utils.blacklist_store import BlacklistStore
+
+ENTRY = {
+    "name": "someone", "reason": "spam", "blacklisted_by": "mod",
+    "timestamp": "2024-01-01T00:00:00", "is_in_server": True,
+}
+
+
+def test_json_imported_once_and_left_in_place(tmp_path):
+    legacy = tmp_path / "blacklist.json"
+    legacy.write_text(json.dumps({"123": ENTRY}))
+    db_path = str(tmp_path / "blacklist.db")
+
+    store = BlacklistStore(db_path, str(legacy))
+    assert store.load() == {"123": ENTRY}
+    store.db.query_sync("DELETE FROM blacklist WHERE user_id = 123")
+    store.close()
+
+    assert legacy.exists()
+    store = BlacklistStore(db_path, str(legacy))
+    assert store.load() == {}  # a removal isn't undone by importing the file again
+    store.close()
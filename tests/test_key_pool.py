@@ -0,0 +1,11 @@
+from utils.key_pool import KeyPool
+
+
+def test_in_flight_call_counts_once():
+    pool = KeyPool(["a"], rpm_limit=2)
+    key = pool.acquire()
+    assert key.load(key.calls[0]) == 1
+    # One call in flight must leave room for the second of two per minute
+    assert pool.acquire() is key
+    pool.release(key)
+    pool.release(key)
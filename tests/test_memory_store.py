@@ -0,0 +1,40 @@
+import asyncio
+
+from utils.memory_store import ConversationMemory
+
+
+def roles(turns):
+    return [(turn.role, turn.content) for turn in turns]
+
+
+def test_append_after_evict_is_reloaded_from_disk(tmp_path):
+    async def scenario():
+        memory = ConversationMemory(str(tmp_path / "memory.db"), max_total_turns=2)
+        await memory.load(1)
+        memory.append(1, "user", "hi")
+        # Channel 2 pushes channel 1 out while its reply is still being generated
+        await memory.load(2)
+        memory.append(2, "user", "a")
+        memory.append(2, "model", "b")
+        assert 1 not in memory
+
+        memory.append(1, "model", "hello")
+        assert 1 not in memory
+        turns = await memory.load(1)
+        memory.db.close()
+        return roles(turns)
+
+    assert asyncio.run(scenario()) == [("user", "hi"), ("model", "hello")]
+
+
+def test_evict_drops_trim_counters(tmp_path):
+    async def scenario():
+        memory = ConversationMemory(str(tmp_path / "memory.db"), max_total_turns=1)
+        await memory.load(1)
+        memory.append(1, "user", "hi")
+        await memory.load(2)
+        memory.append(2, "user", "a")
+        assert 1 not in memory._writes_since_trim
+        memory.db.close()
+
+    asyncio.run(scenario())
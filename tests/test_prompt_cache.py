@@ -0,0 +1,176 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils import prompt_cache
+from utils.prompt_cache import PromptCache
+
+MODEL = "models/test"
+TEXT = "x" * 40
+
+
+class FakeBackend:
+    def __init__(self):
+        self.created = []
+        self.refreshed = []
+        self.fail_create = False
+
+    def create(self, model, key, text, ttl):
+        if self.fail_create:
+            raise RuntimeError("too small")
+        name = f"cachedContents/{len(self.created)}"
+        self.created.append((model, key, text, ttl))
+        return name, SimpleNamespace(name=name)
+
+    def refresh(self, handle, ttl):
+        self.refreshed.append((handle.name, ttl))
+
+
+class FakeClient(FakeBackend):
+    """Backend that also answers generate() and can be told to fail on cached content"""
+
+    def __init__(self, cached_error=None):
+        super().__init__()
+        self.cached_error = cached_error
+        self.calls = []
+
+    def generate(self, model, contents, **config):
+        self.calls.append(config)
+        if "cached_content" in config and self.cached_error:
+            raise self.cached_error
+        cached = 1000 if "cached_content" in config else 0
+        return response(cached, 1100)
+
+
+def response(cached, prompt):
+    usage = SimpleNamespace(cached_content_token_count=cached, prompt_token_count=prompt)
+    return SimpleNamespace(usage_metadata=usage)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(prompt_cache.time, "time", clock)
+    monkeypatch.setattr(prompt_cache.time, "monotonic", clock)
+    return clock
+
+
+def make_cache(backend, **kwargs):
+    kwargs.setdefault("min_tokens", 0)
+    return PromptCache(backend, ttl=3600, refresh_margin=300, retry_after=1800, **kwargs)
+
+
+def test_first_get_creates_prefix_once(clock):
+    backend = FakeBackend()
+    cache = make_cache(backend)
+
+    entry = cache.get(MODEL, "system", TEXT)
+    assert entry.name == "cachedContents/0"
+    assert backend.created == [(MODEL, "system", TEXT, 3600)]
+
+    clock.now += 60
+    assert cache.get(MODEL, "system", TEXT) is entry
+    assert len(backend.created) == 1
+    assert backend.refreshed == []
+
+
+def test_refresh_inside_margin(clock):
+    backend = FakeBackend()
+    cache = make_cache(backend)
+    entry = cache.get(MODEL, "system", TEXT)
+
+    clock.now += 3600 - 299
+    assert cache.get(MODEL, "system", TEXT) is entry
+    assert backend.refreshed == [("cachedContents/0", 3600)]
+    assert entry.expires_at == clock.now + 3600
+    assert len(backend.created) == 1
+
+
+def test_failed_create_waits_retry_after(clock):
+    backend = FakeBackend()
+    backend.fail_create = True
+    cache = make_cache(backend)
+
+    assert cache.get(MODEL, "system", TEXT) is None
+    backend.fail_create = False
+    clock.now += 1799
+    assert cache.get(MODEL, "system", TEXT) is None
+    assert backend.created == []
+
+    clock.now += 1
+    assert cache.get(MODEL, "system", TEXT) is not None
+    assert len(backend.created) == 1
+
+
+def test_invalidate_recreates(clock):
+    backend = FakeBackend()
+    cache = make_cache(backend)
+    first = cache.get(MODEL, "system", TEXT)
+
+    cache.invalidate(MODEL, "system")
+    second = cache.get(MODEL, "system", TEXT)
+    assert second is not first
+    assert second.name == "cachedContents/1"
+
+
+def test_small_prefix_never_hits_the_api(clock):
+    backend = FakeBackend()
+    cache = make_cache(backend, min_tokens=1024)
+
+    assert cache.get(MODEL, "system", "x" * (4 * 1024 - 1)) is None
+    assert backend.created == []
+    assert cache.get(MODEL, "system", "x" * (4 * 1024)) is not None
+
+
+def test_record_usage_counts_cached_tokens(clock):
+    cache = make_cache(FakeBackend())
+
+    assert cache.record_usage(response(1200, 1500)) == 1200
+    assert cache.record_usage(response(None, 300)) == 0
+    assert cache.record_usage(SimpleNamespace()) == 0
+    assert cache.stats == {"requests": 3, "cached_requests": 1, "prompt_tokens": 1800, "tokens_saved": 1200}
+
+
+def test_generate_uses_cached_prefix(clock):
+    client = FakeClient()
+    cache = make_cache(client)
+
+    cache.generate(MODEL, "system", TEXT, "hi", temperature=0.5)
+    assert client.calls == [{"cached_content": "cachedContents/0", "temperature": 0.5}]
+    assert cache.stats["tokens_saved"] == 1000
+
+
+def test_generate_falls_back_inline_when_cache_is_gone(clock):
+    client = FakeClient(cached_error=RuntimeError("404 cached content not found"))
+    cache = make_cache(client)
+
+    cache.generate(MODEL, "system", TEXT, "hi")
+    assert client.calls[-1] == {"system_instruction": TEXT}
+    cache.generate(MODEL, "system", TEXT, "hi")
+    assert len(client.created) == 2  # invalidated, so the next call registers it again
+
+
+def test_generate_reraises_rate_limits(clock):
+    client = FakeClient(cached_error=RuntimeError("429 RESOURCE_EXHAUSTED"))
+    cache = make_cache(client)
+
+    with pytest.raises(RuntimeError):
+        cache.generate(MODEL, "system", TEXT, "hi")
+    assert len(client.calls) == 1
+
+
+def test_disabled_cache_sends_inline(clock):
+    client = FakeClient()
+    cache = make_cache(client, enabled=False)
+
+    cache.generate(MODEL, "system", TEXT, "hi")
+    assert client.calls == [{"system_instruction": TEXT}]
+    assert client.created == []
@@ -0,0 +1,18 @@
+import pytest
+
+from utils.recurrence import parse_recurrence
+
+
+@pytest.mark.parametrize("spec, rule", [
+    ("mon@9", "weekly:1:9:0"),
+    ("monday,wed@9:30", "weekly:5:9:30"),
+    ("weekends@10", "weekly:96:10:0"),
+    ("2h", "interval:7200"),
+])
+def test_parses(spec, rule):
+    assert parse_recurrence(spec) == rule
+
+
+@pytest.mark.parametrize("spec", ["monkey@9", "wednes@9", "satur,sun@9", "mo@9", "mon@24"])
+def test_rejects_words_that_only_start_like_a_day(spec):
+    assert parse_recurrence(spec) is None
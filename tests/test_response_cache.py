@@ -0,0 +1,56 @@
+import pytest
+
+from utils.response_cache import ResponseCache
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("i'm so sad today", "i'm so happy today"),
+    ("how do i learn python", "how do i learn java"),
+    ("should i text my boyfriend", "should i text my girlfriend"),
+    ("what should i do today", "what should i do tomorrow"),
+])
+def test_different_topic_is_a_miss(stored, asked):
+    cache = ResponseCache()
+    cache.store(stored, "answer")
+    assert cache.lookup(asked) is None
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("what's the best anime", "whats the best anime?"),
+    ("who made you", "who created you"),
+    ("what can you do", "what could you do"),
+    ("how do i learn python", "how can i learn python?"),
+    ("what is your favourite song", "whats ur fav song"),
+])
+def test_paraphrase_is_a_hit(stored, asked):
+    cache = ResponseCache()
+    cache.store(stored, "answer")
+    assert cache.lookup(asked) == "answer"
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("how do i learn python", "why should i learn python"),
+    ("what are you", "what can you do"),
+    ("do you like cats", "do i like cats"),
+])
+def test_different_question_word_or_subject_is_a_miss(stored, asked):
+    cache = ResponseCache()
+    cache.store(stored, "answer")
+    assert cache.lookup(asked) is None
+
+
+def test_eviction_drops_signature():
+    cache = ResponseCache(max_entries=1)
+    cache.store("how do i learn python", "python")
+    cache.store("how do i learn java", "java")
+    assert cache.lookup("how can i learn python") is None
+    assert cache.lookup("how can i learn java") == "java"
+
+
+def test_answer_naming_the_asker_is_not_stored():
+    cache = ResponseCache()
+    cache.store("how are you", "I'm great, thanks Alex!", asker="Alex ♡")
+    assert cache.lookup("how are you") is None
+
+    cache.store("how are you", "I'm great, thanks for asking!", asker="Alex ♡")
+    assert cache.lookup("how are you") == "I'm great, thanks for asking!"
@@ -0,0 +1,51 @@
+import math
+import random
+
+import pytest
+
+from utils.scheduler import HeapScheduler
+from utils.timing_wheel import TimingWheel
+
+START = 1_700_000_000
+
+
+def run_both(seed, steps=400):
+    rng = random.Random(seed)
+    wheel, heap = TimingWheel(now=START), HeapScheduler()
+    now, next_id = START, 0
+    for _ in range(steps):
+        op = rng.random()
+        if op < 0.5:
+            # Mostly near-term, sometimes days or over a year out (overflow)
+            horizon = rng.choice((90, 4000, 3 * 86400, 600 * 86400))
+            due = now + rng.random() * horizon
+            if rng.random() < 0.2 and next_id:
+                reminder_id = rng.randrange(next_id)  # reschedule an existing id
+            else:
+                reminder_id, next_id = next_id, next_id + 1
+            wheel.add(reminder_id, due)
+            heap.add(reminder_id, due)
+        elif op < 0.65 and next_id:
+            reminder_id = rng.randrange(next_id)
+            assert wheel.cancel(reminder_id) == heap.cancel(reminder_id)
+        else:
+            now += rng.choice((1, 1, 7, 59, 3600, 86400, 40 * 86400))
+            assert sorted(wheel.pop_due(now)) == sorted(heap.pop_due(now))
+
+        assert len(wheel) == len(heap)
+        heap_next = heap.next_due()
+        wheel_next = wheel.next_due()
+        if heap_next is None:
+            assert wheel_next is None
+        else:
+            # The wheel only promises a lower bound that never lets a reminder fire late
+            assert wheel_next is not None and wheel_next <= math.ceil(heap_next)
+
+    now += 700 * 86400
+    assert sorted(wheel.pop_due(now)) == sorted(heap.pop_due(now))
+    assert len(wheel) == len(heap) == 0
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_wheel_matches_heap(seed):
+    run_both(seed)
@@ -0,0 +1,29 @@
+class BlacklistIndex:
+    """Integer-keyed view of the blacklist for the on_message hot path.
+
+    Guarded channels are a frozenset and blacklisted users a set of ints, so the
+    common case (someone not blacklisted) is two hash lookups with no str() per
+    message. The cog keeps it in sync with the store on every add/remove.
+    """
+
+    __slots__ = ("channels", "user_ids")
+
+    def __init__(self, channels, user_ids=()):
+        self.channels = frozenset(channels)
+        self.user_ids = {int(user_id) for user_id in user_ids}
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def __contains__(self, user_id):
+        return user_id in self.user_ids
+
+    def blocks(self, channel_id, user_id):
+        """Whether a message from `user_id` in `channel_id` must be removed"""
+        return channel_id in self.channels and user_id in self.user_ids
+
+    def add(self, user_id):
+        self.user_ids.add(int(user_id))
+
+    def discard(self, user_id):
+        self.user_ids.discard(int(user_id))
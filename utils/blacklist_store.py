@@ -0,0 +1,85 @@
+import json
+import os
+
+from utils.db import Database
+
+BLACKLIST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blacklist (
+    user_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    blacklisted_by TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    is_in_server INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+FIELDS = ("name", "reason", "blacklisted_by", "timestamp", "is_in_server")
+
+
+class BlacklistStore:
+    """SQLite (WAL) home of the cupid blacklist.
+
+    Every add/remove is its own transaction on the database worker thread, so a
+    crash can't leave a half-written file behind and the event loop never waits
+    on disk. The first start imports the old blacklist.json once; the file itself
+    is left untouched.
+    """
+
+    def __init__(self, path="blacklist.db", legacy_json="blacklist.json"):
+        self.db = Database(path, BLACKLIST_SCHEMA)
+        self.migrate_json(legacy_json)
+
+    def migrate_json(self, legacy_json):
+        """Import blacklist.json into an empty table, once (recorded in `meta`, the file stays put)"""
+        if not legacy_json or not os.path.exists(legacy_json):
+            return
+        if self.db.query_sync("SELECT 1 FROM meta WHERE key = 'json_migrated'"):
+            return
+        if self.db.query_sync("SELECT 1 FROM blacklist LIMIT 1"):
+            self.db.query_sync("INSERT OR IGNORE INTO meta (key, value) VALUES ('json_migrated', 'skipped')")
+            return
+        try:
+            with open(legacy_json, 'r') as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not migrate {legacy_json}: {e}")
+            return
+
+        statements = [
+            ("INSERT OR REPLACE INTO blacklist (user_id, name, reason, blacklisted_by, timestamp, is_in_server) "
+             "VALUES (?, ?, ?, ?, ?, ?)",
+             (int(user_id), entry.get('name', ''), entry.get('reason', ''), entry.get('blacklisted_by', ''),
+              entry.get('timestamp', ''), int(bool(entry.get('is_in_server', False)))))
+            for user_id, entry in legacy.items()
+        ]
+        # Same transaction as the rows, so a crash can't leave the import half-recorded
+        statements.append(("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)", (legacy_json,)))
+        self.db.transaction_sync(statements)
+        print(f"Migrated {len(legacy)} blacklist entries from {legacy_json}")
+
+    def load(self):
+        """Every entry as {str(user_id): {...}} (blocking - called once at cog load)"""
+        rows = self.db.query_sync(f"SELECT user_id, {', '.join(FIELDS)} FROM blacklist")
+        entries = {}
+        for user_id, *values in rows:
+            entry = dict(zip(FIELDS, values))
+            entry['is_in_server'] = bool(entry['is_in_server'])
+            entries[str(user_id)] = entry
+        return entries
+
+    async def add(self, user_id, entry):
+        await self.db.query(
+            f"INSERT OR REPLACE INTO blacklist (user_id, {', '.join(FIELDS)}) VALUES (?, ?, ?, ?, ?, ?)",
+            (int(user_id),) + tuple(entry[f] for f in FIELDS[:4]) + (int(bool(entry['is_in_server'])),)
+        )
+
+    async def remove(self, user_id):
+        await self.db.query("DELETE FROM blacklist WHERE user_id = ?", (int(user_id),))
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,132 @@
+import random
+import re
+from collections import Counter
+
+# Custom discord emoji (<:name:id> / <a:name:id>) and the common unicode emoji blocks
+CUSTOM_EMOJI_RE = re.compile(r'<a?:\w+:\d+>')
+UNICODE_EMOJI_RE = re.compile(
+    '[\U0001F000-\U0001FAFF\U00002600-\U000027BF\U0001F1E6-\U0001F1FF'
+    '‍️❤❣⭐⭕✅❌‼⁉]+'
+)
+REPEATED_CHAR_RE = re.compile(r'(.)\1{2,}')
+NON_WORD_RE = re.compile(r'[^\w\s]')
+
+SKIP = "skip"
+REACT = "react"
+REPLY = "reply"
+PASS = "pass"
+
+
+class Decision:
+    __slots__ = ("action", "payload")
+
+    def __init__(self, action, payload=None):
+        self.action = action
+        self.payload = payload
+
+
+class ChatPrefilter:
+    """Cheap local stage in front of Gemini for messages that don't need a model.
+
+    Everything here is a plain attribute or dict so it can be tuned at runtime
+    (see the `aifilter` command in the AI cog).
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.min_length = 2  # anything shorter (after cleanup) is skipped
+
+        # Emoji-only messages get one of these as a reaction
+        self.emoji_reactions = ["💖", "✨", "🥺", "😭"]
+
+        # phrase -> emoji to react with
+        self.reaction_phrases = {
+            "lol": "😭", "lmao": "😭", "lmfao": "😭", "haha": "😂", "hahaha": "😂",
+            "xd": "😂", "omg": "😳", "wow": "😳", "ily": "💖", "love you": "💖",
+            "gn": "🌙", "goodnight": "🌙", "good night": "🌙",
+        }
+
+        # phrase -> canned answers (one picked at random)
+        self.canned_responses = {
+            "hi": ["hiii", "heyy, what's up?", "hi hi"],
+            "hello": ["hiii", "hello!! how's it going?"],
+            "hey": ["heyy", "hey, what's up?"],
+            "ty": ["np!", "anytime"],
+            "thanks": ["np!", "anytime ♡"],
+            "thank you": ["np!", "anytime ♡"],
+            "gm": ["good morning!!", "gm gm"],
+            "good morning": ["good morning!!", "morning ♡"],
+        }
+
+        # phrases that don't need any answer at all
+        self.skip_phrases = {"ok", "okay", "k", "kk", "okk", "mhm", "ye", "yea", "yeah", "ya", "hm", "hmm", "oh", "ah"}
+
+        self.counters = Counter()
+
+    @staticmethod
+    def normalize(text):
+        text = NON_WORD_RE.sub(' ', text.lower())
+        text = REPEATED_CHAR_RE.sub(r'\1\1', text)  # "lolll" -> "loll", "heyyyy" -> "heyy"
+        return ' '.join(text.split())
+
+    def lookup(self, table, phrase):
+        """Exact match, then with doubled trailing letters collapsed ("heyy" -> "hey")"""
+        if phrase in table:
+            return table[phrase] if isinstance(table, dict) else True
+        collapsed = re.sub(r'(.)\1+', r'\1', phrase)
+        if collapsed in table:
+            return table[collapsed] if isinstance(table, dict) else True
+        return None
+
+    def classify(self, content, mentioned=False, has_attachments=False):
+        """Decide what to do with a message: skip / react / reply / pass (go to Gemini)"""
+        if not self.enabled:
+            return Decision(PASS)
+
+        stripped = content.strip()
+
+        if not stripped:
+            # Sticker / image only. A bare mention still gets a greeting.
+            if mentioned:
+                return self._count(Decision(REPLY, random.choice(self.canned_responses.get("hi") or ["hiii"])))
+            if has_attachments:
+                return self._count(Decision(REACT, random.choice(self.emoji_reactions)))
+            return self._count(Decision(SKIP))
+
+        without_emoji = UNICODE_EMOJI_RE.sub('', CUSTOM_EMOJI_RE.sub('', stripped)).strip()
+        if not without_emoji:
+            return self._count(Decision(REACT, random.choice(self.emoji_reactions)))
+
+        phrase = self.normalize(without_emoji)
+        if not phrase:
+            return self._count(Decision(SKIP))
+
+        emoji = self.lookup(self.reaction_phrases, phrase)
+        if emoji:
+            return self._count(Decision(REACT, emoji))
+
+        answers = self.lookup(self.canned_responses, phrase)
+        if answers:
+            return self._count(Decision(REPLY, random.choice(answers)))
+
+        if self.lookup(self.skip_phrases, phrase) or len(phrase) < self.min_length:
+            return self._count(Decision(SKIP))
+
+        return self._count(Decision(PASS))
+
+    def _count(self, decision):
+        self.counters[decision.action] += 1
+        if decision.action != PASS:
+            self.counters["avoided_calls"] += 1
+        return decision
+
+    def stats(self):
+        total = sum(self.counters[a] for a in (SKIP, REACT, REPLY, PASS))
+        return {
+            "total": total,
+            "skipped": self.counters[SKIP],
+            "reacted": self.counters[REACT],
+            "canned": self.counters[REPLY],
+            "sent_to_ai": self.counters[PASS],
+            "avoided_calls": self.counters["avoided_calls"],
+        }
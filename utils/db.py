@@ -0,0 +1,89 @@
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Database:
+    """Tiny SQLite wrapper that runs every statement on a single worker thread.
+
+    The connection is opened in WAL mode and is only ever touched by the worker,
+    so writes are serialized and never block the event loop.
+    """
+
+    def __init__(self, path, schema=""):
+        self.path = path
+        self.schema = schema
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"sqlite:{path}")
+        self._conn = None
+        self._closed = False
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            if self.schema:
+                self._conn.executescript(self.schema)
+            self._conn.commit()
+        return self._conn
+
+    def _run(self, sql, params=(), many=False):
+        conn = self._connection()
+        with conn:
+            cursor = conn.executemany(sql, params) if many else conn.execute(sql, params)
+            return cursor.fetchall()
+
+    def _run_script(self, statements):
+        conn = self._connection()
+        with conn:
+            for sql, params in statements:
+                conn.execute(sql, params)
+
+    # ----- blocking API (startup / shutdown only) -----
+    def query_sync(self, sql, params=()):
+        """Run a statement from synchronous code and wait for the rows"""
+        return self._executor.submit(self._run, sql, params).result()
+
+    def transaction_sync(self, statements):
+        """Run several statements atomically from synchronous code"""
+        return self._executor.submit(self._run_script, list(statements)).result()
+
+    # ----- async API -----
+    async def query(self, sql, params=()):
+        """Run a statement off the event loop and return the rows"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run, sql, params)
+
+    async def execute_many(self, sql, rows):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run, sql, list(rows), True)
+
+    async def transaction(self, statements):
+        """Run several (sql, params) statements in one atomic transaction"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run_script, list(statements))
+
+    def submit(self, sql, params=()):
+        """Fire-and-forget write. Statements still run in submission order."""
+        future = self._executor.submit(self._run, sql, params)
+        future.add_done_callback(self._report_error)
+        return future
+
+    @staticmethod
+    def _report_error(future):
+        error = future.exception()
+        if error:
+            print(f"🔴 SQLite write failed: {error}")
+
+    def close(self):
+        """Flush pending writes and close the connection"""
+        if self._closed:
+            return
+        self._closed = True
+
+        def _close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        self._executor.submit(_close).result()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,141 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class NoKeyAvailable(Exception):
+    """Every key in the pool is cooling down after a 429 (or none are configured)"""
+
+
+class ApiKey:
+    __slots__ = ("name", "value", "rpm_limit", "calls", "in_flight", "cooldown_until",
+                 "total_requests", "total_errors", "total_rate_limited", "client")
+
+    def __init__(self, name, value, rpm_limit):
+        self.name = name
+        self.value = value
+        self.rpm_limit = rpm_limit
+        self.calls = deque()  # monotonic timestamps of calls in the last minute
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.total_requests = 0
+        self.total_errors = 0
+        self.total_rate_limited = 0
+        self.client = None
+
+    def load(self, now):
+        """Calls started in the last minute (in-flight ones are already in `calls`)"""
+        while self.calls and now - self.calls[0] > 60:
+            self.calls.popleft()
+        return len(self.calls)
+
+    def healthy(self, now):
+        return now >= self.cooldown_until and self.load(now) < self.rpm_limit
+
+
+class KeyPool:
+    """Routes Gemini calls across several API keys.
+
+    Each key tracks its own requests-per-minute and goes on cooldown after a 429.
+    `lease()` hands out the least loaded healthy key.
+    """
+
+    def __init__(self, keys, rpm_limit=15, cooldown=60):
+        self.cooldown = cooldown
+        self.keys = [ApiKey(f"key{i + 1}", value, rpm_limit) for i, value in enumerate(keys)]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """AI_API_KEYS=key1,key2,... (falls back to the single AI_API_KEY)"""
+        raw = os.getenv('AI_API_KEYS') or os.getenv('AI_API_KEY') or ''
+        keys = list(dict.fromkeys(k.strip() for k in raw.split(',') if k.strip()))
+        rpm_limit = int(os.getenv('AI_KEY_RPM', '15'))
+        cooldown = int(os.getenv('AI_KEY_COOLDOWN', '60'))
+        return cls(keys, rpm_limit=rpm_limit, cooldown=cooldown)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __bool__(self):
+        return bool(self.keys)
+
+    def acquire(self):
+        """Reserve the least loaded healthy key (blocking-safe, no awaiting)"""
+        with self._lock:
+            now = time.monotonic()
+            candidates = [k for k in self.keys if k.healthy(now)]
+            if not candidates:
+                raise NoKeyAvailable("429: all API keys are rate limited or cooling down")
+            key = min(candidates, key=lambda k: (k.load(now), k.in_flight, k.total_requests))
+            key.calls.append(now)
+            key.in_flight += 1
+            key.total_requests += 1
+            return key
+
+    def release(self, key, error=None):
+        with self._lock:
+            key.in_flight -= 1
+            if error is None:
+                return
+            key.total_errors += 1
+            if is_rate_limit(error):
+                key.total_rate_limited += 1
+                key.cooldown_until = time.monotonic() + retry_delay(error, self.cooldown)
+
+    @contextmanager
+    def lease(self):
+        """with pool.lease() as key: ... - puts the key on cooldown if the call 429s"""
+        key = self.acquire()
+        try:
+            yield key
+        except Exception as e:
+            self.release(key, e)
+            raise
+        else:
+            self.release(key)
+
+    def client_for(self, key, factory):
+        """One SDK client per key, created on first use"""
+        if key.client is None:
+            key.client = factory(api_key=key.value)
+        return key.client
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                "name": k.name,
+                "suffix": k.value[-4:],
+                "rpm": k.load(now),
+                "rpm_limit": k.rpm_limit,
+                "requests": k.total_requests,
+                "errors": k.total_errors,
+                "rate_limited": k.total_rate_limited,
+                "cooldown": max(0, int(k.cooldown_until - now)),
+            } for k in self.keys]
+
+
+def is_rate_limit(error):
+    text = str(error)
+    return "429" in text or "RESOURCE_EXHAUSTED" in text or "quota" in text.lower()
+
+
+def retry_delay(error, default):
+    """Use the server's retryDelay hint when the error carries one"""
+    m = re.search(r"retry(?:_d|D)elay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", str(error))
+    return float(m.group(1)) if m else default
+
+
+KEY_POOL = None
+
+
+def get_key_pool():
+    """Process-wide pool so every cog shares the same per-key quota accounting"""
+    global KEY_POOL
+    if KEY_POOL is None:
+        KEY_POOL = KeyPool.from_env()
+    return KEY_POOL
@@ -0,0 +1,172 @@
+import time
+from collections import OrderedDict, deque
+
+from utils.db import Database
+
+MEMORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel_id INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_turns_channel ON turns (channel_id, id);
+"""
+
+
+class Turn:
+    """One chat turn. Slotted so thousands of them stay cheap."""
+    __slots__ = ("role", "content")
+
+    def __init__(self, role, content):
+        self.role = role
+        self.content = content
+
+    def as_api(self):
+        return {"role": self.role, "parts": [{"text": self.content}]}
+
+
+class ConversationMemory:
+    """Per-channel chat history with a global turn cap and SQLite write-through.
+
+    Channels are kept in LRU order. When the total number of turns held in memory
+    goes over `max_total_turns`, or a channel has been idle for `idle_seconds`,
+    the least recently used channels are dropped from RAM. Their history is still
+    on disk and gets reloaded the next time someone talks in that channel.
+    """
+
+    def __init__(self, db_path="memory.db", max_turns=50, max_total_turns=5000, idle_seconds=6 * 3600):
+        self.max_turns = max_turns
+        self.max_total_turns = max_total_turns
+        self.idle_seconds = idle_seconds
+        self.db = Database(db_path, MEMORY_SCHEMA) if db_path else None
+
+        self._channels = OrderedDict()  # channel_id -> deque[Turn]
+        self._last_used = {}
+        self._total_turns = 0
+        self._writes_since_trim = {}
+        self._loading = {}  # channel_id -> turns appended while its history was being read
+
+    def __contains__(self, channel_id):
+        return channel_id in self._channels
+
+    def __len__(self):
+        return len(self._channels)
+
+    @property
+    def total_turns(self):
+        return self._total_turns
+
+    async def load(self, channel_id):
+        """Make sure a channel's history is in memory, pulling it from disk if needed"""
+        if channel_id in self._channels:
+            self._touch(channel_id)
+            return self._channels[channel_id]
+
+        turns = deque(maxlen=self.max_turns)
+        if self.db:
+            appended = self._loading.setdefault(channel_id, [])
+            try:
+                rows = await self.db.query(
+                    "SELECT role, content FROM turns WHERE channel_id = ? ORDER BY id DESC LIMIT ?",
+                    (channel_id, self.max_turns)
+                )
+            finally:
+                if self._loading.get(channel_id) is appended:
+                    del self._loading[channel_id]
+            turns.extend(Turn(role, content) for role, content in reversed(rows))
+            # Turns written while the read was in flight may not be in `rows`
+            turns.extend(appended)
+
+        # Another coroutine may have loaded the channel while we were waiting on disk
+        if channel_id in self._channels:
+            self._touch(channel_id)
+            return self._channels[channel_id]
+
+        self._channels[channel_id] = turns
+        self._total_turns += len(turns)
+        self._touch(channel_id)
+        self._evict()
+        return turns
+
+    def history(self, channel_id):
+        """Return the in-memory turns of a channel in API format"""
+        turns = self._channels.get(channel_id)
+        if not turns:
+            return []
+        self._touch(channel_id)
+        return [turn.as_api() for turn in turns]
+
+    def recent(self, channel_id, count):
+        """Return the last `count` turns of a channel (oldest first)"""
+        turns = self._channels.get(channel_id)
+        if not turns:
+            return []
+        return list(turns)[-count:]
+
+    def append(self, channel_id, role, content):
+        """Add a turn to memory and queue it for disk"""
+        turns = self._channels.get(channel_id)
+        if turns is None and self.db:
+            # Not in memory (evicted while a query was in flight, or never loaded): only write it
+            # to disk, so the next load() still sees the channel as missing and reads it all back
+            if channel_id in self._loading:
+                self._loading[channel_id].append(Turn(role, content))
+            self.db.submit(
+                "INSERT INTO turns (channel_id, role, content) VALUES (?, ?, ?)",
+                (channel_id, role, content)
+            )
+            self._maybe_trim(channel_id)
+            return
+        if turns is None:
+            turns = deque(maxlen=self.max_turns)
+            self._channels[channel_id] = turns
+
+        if len(turns) == turns.maxlen:
+            self._total_turns -= 1
+        turns.append(Turn(role, content))
+        self._total_turns += 1
+        self._touch(channel_id)
+
+        if self.db:
+            self.db.submit(
+                "INSERT INTO turns (channel_id, role, content) VALUES (?, ?, ?)",
+                (channel_id, role, content)
+            )
+            self._maybe_trim(channel_id)
+
+        self._evict()
+
+    def close(self):
+        if self.db:
+            self.db.close()
+
+    def _touch(self, channel_id):
+        self._channels.move_to_end(channel_id)
+        self._last_used[channel_id] = time.monotonic()
+
+    def _evict(self):
+        """Drop idle / least recently used channels from RAM (disk copy stays)"""
+        now = time.monotonic()
+        while len(self._channels) > 1:
+            oldest = next(iter(self._channels))
+            idle = now - self._last_used.get(oldest, now) > self.idle_seconds
+            if not idle and self._total_turns <= self.max_total_turns:
+                break
+            turns = self._channels.pop(oldest)
+            self._last_used.pop(oldest, None)
+            self._writes_since_trim.pop(oldest, None)
+            self._total_turns -= len(turns)
+
+    def _maybe_trim(self, channel_id):
+        """Keep only the last `max_turns` rows per channel on disk, checked every few writes"""
+        count = self._writes_since_trim.get(channel_id, 0) + 1
+        if count < self.max_turns:
+            self._writes_since_trim[channel_id] = count
+            return
+        self._writes_since_trim[channel_id] = 0
+        self.db.submit(
+            "DELETE FROM turns WHERE channel_id = ? AND id NOT IN "
+            "(SELECT id FROM turns WHERE channel_id = ? ORDER BY id DESC LIMIT ?)",
+            (channel_id, channel_id, self.max_turns)
+        )
@@ -0,0 +1,24 @@
+DISCORD_MESSAGE_LIMIT = 2000
+
+
+def split_lines(lines, header="", limit=DISCORD_MESSAGE_LIMIT):
+    """Pack lines into as few messages as possible, each under `limit` characters.
+
+    The header is repeated at the top of every chunk; a single line that is too
+    long on its own is truncated.
+    """
+    chunks = []
+    current = header
+    for line in lines:
+        room = limit - len(header) - 1
+        if len(line) > room:
+            line = line[:room - 1] + "…"
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = f"{header}\n{line}" if header else line
+        else:
+            current = candidate
+    if current and current != header:
+        chunks.append(current)
+    return chunks
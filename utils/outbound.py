@@ -0,0 +1,256 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+
+import discord
+
+from utils.rate_limit import SlidingWindowLimiter
+
+# Priorities (lower goes first when several buckets are free)
+MODERATION = 0   # deletes / blacklist notices
+REPLY = 1        # direct answers to a user
+NOTIFY = 2       # reminders, announcements
+FUN = 3          # decorative reactions
+PRIORITY_NAMES = {MODERATION: "moderation", REPLY: "reply", NOTIFY: "notify", FUN: "fun"}
+
+# (max_calls, period) per route, per channel / DM recipient - kept a little under Discord's buckets
+ROUTE_LIMITS = {
+    "message": (5, 5.0),
+    "dm": (5, 5.0),
+    "reaction": (4, 1.0),
+    "delete": (5, 1.0),
+}
+GLOBAL_LIMIT = (45, 1.0)  # Discord's global cap is 50 requests/s
+MAX_ATTEMPTS = 3          # 429s before a send is given up on
+
+
+class OutboundJob:
+    __slots__ = ("route", "bucket_id", "factory", "priority", "coalesce_key",
+                 "future", "enqueued", "attempts")
+
+    def __init__(self, route, bucket_id, factory, priority, coalesce_key, future):
+        self.route = route
+        self.bucket_id = bucket_id
+        self.factory = factory
+        self.priority = priority
+        self.coalesce_key = coalesce_key
+        self.future = future
+        self.enqueued = time.monotonic()
+        self.attempts = 0
+
+
+class OutboundQueue:
+    """One dispatch queue for everything the bot sends, reacts or deletes.
+
+    Each (route, channel) pair is a bucket with its own sliding-window limit and
+    at most one request in flight, so messages to one channel keep their order.
+    When several buckets are free the highest priority job goes first. An
+    identical reply, reaction or delete that is still pending is shared instead of
+    sent twice (sends opt in with coalesce=True).
+    Every call returns a future that resolves to the API result.
+    """
+
+    def __init__(self, route_limits=ROUTE_LIMITS, global_limit=GLOBAL_LIMIT):
+        self.limiters = {route: SlidingWindowLimiter(*limit) for route, limit in route_limits.items()}
+        self.global_limiter = SlidingWindowLimiter(*global_limit)
+        self._buckets = {}       # (route, bucket_id) -> heap of (priority, seq, job)
+        self._in_flight = set()  # buckets with a request on the wire
+        self._pending = {}       # coalesce_key -> job not started yet
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._task = None
+        self._running = set()    # keeps references to in-flight request tasks
+
+        self.counters = dict(submitted=0, sent=0, failed=0, coalesced=0, retried=0)
+        self.waits = deque(maxlen=1000)  # seconds between submit and start, most recent jobs
+
+    # -- submitting --------------------------------------------------------
+
+    def submit(self, route, bucket_id, factory, priority=NOTIFY, coalesce_key=None):
+        """Queue `factory()` (a coroutine function) on a route/bucket and return its future"""
+        if coalesce_key is not None:
+            job = self._pending.get(coalesce_key)
+            if job is not None:
+                self.counters["coalesced"] += 1
+                return job.future
+
+        loop = asyncio.get_running_loop()
+        self._ensure_running(loop)
+
+        future = loop.create_future()
+        future.add_done_callback(_consume_exception)
+        job = OutboundJob(route, bucket_id, factory, priority, coalesce_key, future)
+        if coalesce_key is not None:
+            self._pending[coalesce_key] = job
+        self._push(job)
+        self.counters["submitted"] += 1
+        return future
+
+    def send(self, target, content=None, *, priority=NOTIFY, coalesce=False, **kwargs):
+        """target.send(...) for a channel, or a DM when target is a user/member.
+
+        Not coalesced by default: two events with the same text (e.g. two reminders) are
+        still two messages. Pass coalesce=True only when a repeat really is redundant.
+        """
+        route = "dm" if isinstance(target, (discord.User, discord.Member, discord.DMChannel)) else "message"
+        key = (route, target.id, _fingerprint(content, kwargs)) if coalesce else None
+        return self.submit(route, target.id, lambda: target.send(content, **kwargs), priority, key)
+
+    def reply(self, message, content=None, *, priority=REPLY, coalesce=True, **kwargs):
+        key = ("reply", message.id, _fingerprint(content, kwargs)) if coalesce else None
+        return self.submit("message", message.channel.id, lambda: message.reply(content, **kwargs), priority, key)
+
+    def react(self, message, emoji, *, priority=FUN):
+        key = ("reaction", message.id, str(emoji))
+        return self.submit("reaction", message.channel.id, lambda: message.add_reaction(emoji), priority, key)
+
+    def delete(self, message, *, priority=MODERATION):
+        key = ("delete", message.id)
+        return self.submit("delete", message.channel.id, message.delete, priority, key)
+
+    # -- dispatching -------------------------------------------------------
+
+    def _push(self, job):
+        bucket = (job.route, job.bucket_id)
+        heapq.heappush(self._buckets.setdefault(bucket, []), (job.priority, next(self._seq), job))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _ensure_running(self, loop):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            wait = self._dispatch_ready()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dispatch_ready(self):
+        """Start every job whose bucket is free; return seconds until the next one could start"""
+        while True:
+            soonest = None
+            heads = sorted(
+                (queue[0][:2], bucket) for bucket, queue in self._buckets.items()
+                if bucket not in self._in_flight
+            )
+            for _, bucket in heads:
+                limiter = self.limiters.get(bucket[0])
+                wait = max(
+                    limiter.delay(bucket[1]) if limiter else 0.0,
+                    self.global_limiter.delay(None)
+                )
+                if wait > 0:
+                    soonest = wait if soonest is None else min(soonest, wait)
+                    continue
+                self._start(bucket)
+                break
+            else:
+                return soonest
+
+    def _start(self, bucket):
+        queue = self._buckets[bucket]
+        _, _, job = heapq.heappop(queue)
+        if not queue:
+            del self._buckets[bucket]
+        if job.coalesce_key is not None and self._pending.get(job.coalesce_key) is job:
+            del self._pending[job.coalesce_key]
+
+        if job.route in self.limiters:
+            self.limiters[job.route].hit(job.bucket_id)
+        self.global_limiter.hit(None)
+        if job.attempts == 0:
+            self.waits.append(time.monotonic() - job.enqueued)
+        self._in_flight.add(bucket)
+        task = asyncio.get_running_loop().create_task(self._execute(bucket, job))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _execute(self, bucket, job):
+        try:
+            result = await job.factory()
+        except discord.HTTPException as e:
+            if e.status == 429 and job.attempts + 1 < MAX_ATTEMPTS:
+                job.attempts += 1
+                self.counters["retried"] += 1
+                retry_after = getattr(e, 'retry_after', None) or 5
+                if job.route in self.limiters:
+                    self.limiters[job.route].penalize(job.bucket_id, retry_after)
+                self._push(job)
+            else:
+                self._fail(job, e)
+        except Exception as e:
+            self._fail(job, e)
+        else:
+            self.counters["sent"] += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._in_flight.discard(bucket)
+            self._wakeup.set()
+
+    def _fail(self, job, error):
+        self.counters["failed"] += 1
+        # Closed DMs and already-deleted messages are routine; everything else is worth a line
+        if not (isinstance(error, discord.NotFound) or (job.route == "dm" and isinstance(error, discord.Forbidden))):
+            print(f"⚠️ Outbound {job.route} to {job.bucket_id} failed: {error}")
+        if not job.future.done():
+            job.future.set_exception(error)
+
+    # -- metrics -----------------------------------------------------------
+
+    def depth(self):
+        return sum(len(queue) for queue in self._buckets.values())
+
+    def stats(self):
+        by_priority = {name: 0 for name in PRIORITY_NAMES.values()}
+        for queue in self._buckets.values():
+            for priority, _, _ in queue:
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                by_priority[name] = by_priority.get(name, 0) + 1
+
+        waits = sorted(self.waits)
+        return dict(
+            self.counters,
+            depth=sum(by_priority.values()),
+            depth_by_priority=by_priority,
+            in_flight=len(self._in_flight),
+            buckets=len(self._buckets),
+            wait_avg=sum(waits) / len(waits) if waits else 0.0,
+            wait_p95=waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+            wait_max=waits[-1] if waits else 0.0,
+        )
+
+
+def _fingerprint(content, kwargs):
+    """Hashable summary of a send so identical pending sends can be merged"""
+    parts = []
+    for name, value in sorted(kwargs.items()):
+        if isinstance(value, discord.Embed):
+            value = repr(value.to_dict())
+        elif not isinstance(value, (str, int, float, bool, type(None))):
+            value = id(value)
+        parts.append((name, value))
+    return content, tuple(parts)
+
+
+def _consume_exception(future):
+    # Fire-and-forget callers never await the handle; don't let asyncio warn about it
+    if not future.cancelled():
+        future.exception()
+
+
+OUTBOUND = None
+
+def get_outbound():
+    """Process-wide queue so every cog shares the same rate-limit buckets"""
+    global OUTBOUND
+    if OUTBOUND is None:
+        OUTBOUND = OutboundQueue()
+    return OUTBOUND
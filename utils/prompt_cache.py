@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+
+from utils.key_pool import is_rate_limit
+
+# The API rejects cached content below a minimum size (1024 tokens on the flash
+# models). Today's instruction prompts are a few hundred tokens, so with the
+# default they're always sent inline and no cache is ever created.
+MIN_CACHED_TOKENS = int(os.getenv('AI_PROMPT_CACHE_MIN_TOKENS', '1024'))
+CHARS_PER_TOKEN = 4  # rough estimate, good enough to skip a doomed create()
+
+
+class CachedPrefix:
+    """A static prompt prefix registered with the API's cached-content store"""
+    __slots__ = ("name", "handle", "expires_at")
+
+    def __init__(self, name, handle, expires_at):
+        self.name = name
+        self.handle = handle
+        self.expires_at = expires_at
+
+
+class ClientCacheBackend:
+    """Cached-content backend for the `google.genai` client SDK"""
+
+    def __init__(self, client, types_module):
+        self.client = client
+        self.types = types_module
+
+    def create(self, model, key, text, ttl):
+        cache = self.client.caches.create(
+            model=model,
+            config=self.types.CreateCachedContentConfig(
+                display_name=key,
+                system_instruction=text,
+                ttl=f"{int(ttl)}s"
+            )
+        )
+        return cache.name, cache
+
+    def refresh(self, handle, ttl):
+        self.client.caches.update(
+            name=handle.name,
+            config=self.types.UpdateCachedContentConfig(ttl=f"{int(ttl)}s")
+        )
+
+    def generate(self, model, contents, **config):
+        return self.client.models.generate_content(
+            model=model, contents=contents,
+            config=self.types.GenerateContentConfig(**config)
+        )
+
+
+class PromptCache:
+    """Registers static instruction prefixes once per model and keeps them warm.
+
+    `backend` is anything with `create(model, key, text, ttl) -> (name, handle)`,
+    `refresh(handle, ttl)` and `generate(model, contents, **config)`, so a local
+    stand-in can be dropped in for the real API. Prefixes estimated under
+    `min_tokens` are never sent to the API. When a prefix can't be cached (caching
+    disabled, API unsupported, quota...) `get` returns None for a while and
+    `generate` sends the prompt inline.
+    """
+
+    def __init__(self, backend, ttl=3600, refresh_margin=300, retry_after=1800, min_tokens=MIN_CACHED_TOKENS,
+                 enabled=True):
+        self.backend = backend
+        self.enabled = enabled
+        self.min_tokens = min_tokens
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.retry_after = retry_after
+        self._entries = {}   # (model, key) -> CachedPrefix
+        self._failed = {}    # (model, key) -> time.monotonic() of last failure
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "cached_requests": 0, "prompt_tokens": 0, "tokens_saved": 0}
+
+    def get(self, model, key, text):
+        """Return a live CachedPrefix for this model/prefix, or None to go inline.
+
+        Blocking - call it from the same executor thread as the API request.
+        """
+        if not self.enabled or self.backend is None or len(text) // CHARS_PER_TOKEN < self.min_tokens:
+            return None
+
+        slot = (model, key)
+        with self._lock:
+            now = time.time()
+            entry = self._entries.get(slot)
+
+            if entry and entry.expires_at - now > self.refresh_margin:
+                return entry
+
+            if entry:
+                try:
+                    self.backend.refresh(entry.handle, self.ttl)
+                    entry.expires_at = now + self.ttl
+                    return entry
+                except Exception as e:
+                    print(f"⚠️ Prompt cache refresh failed for {key}@{model}: {e}")
+                    del self._entries[slot]
+
+            failed_at = self._failed.get(slot)
+            if failed_at is not None and time.monotonic() - failed_at < self.retry_after:
+                return None
+
+            try:
+                name, handle = self.backend.create(model, key, text, self.ttl)
+            except Exception as e:
+                print(f"⚠️ Prompt caching unavailable for {key}@{model}, sending inline: {e}")
+                self._failed[slot] = time.monotonic()
+                return None
+
+            self._failed.pop(slot, None)
+            entry = CachedPrefix(name, handle, now + self.ttl)
+            self._entries[slot] = entry
+            return entry
+
+    def invalidate(self, model, key):
+        """Forget a prefix (e.g. the API said the cache no longer exists)"""
+        with self._lock:
+            self._entries.pop((model, key), None)
+
+    def generate(self, model, key, text, contents, **config):
+        """Blocking API call with `text` as the instructions: cached prefix if there is one, inline otherwise"""
+        entry = self.get(model, key, text)
+        if entry:
+            try:
+                response = self.backend.generate(model, contents, cached_content=entry.name, **config)
+            except Exception as e:
+                if is_rate_limit(e):
+                    raise  # the key pool puts the key on cooldown
+                # Cached content vanished server-side - fall through to the inline prompt
+                self.invalidate(model, key)
+            else:
+                self.record_usage(response)
+                return response
+
+        response = self.backend.generate(model, contents, system_instruction=text, **config)
+        self.record_usage(response)
+        return response
+
+    def record_usage(self, response):
+        """Count how many input tokens of one response came from the cache"""
+        usage = getattr(response, "usage_metadata", None)
+        cached = getattr(usage, "cached_content_token_count", 0) or 0
+        prompt = getattr(usage, "prompt_token_count", 0) or 0
+
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["prompt_tokens"] += prompt
+            if cached:
+                self.stats["cached_requests"] += 1
+                self.stats["tokens_saved"] += cached
+        return cached
+
+
+PROMPT_CACHES = {}  # api key name -> PromptCache (cached content belongs to the key's project)
+
+def get_prompt_cache(api_key, client, types_module):
+    """Process-wide PromptCache for one API key, shared by every cog that calls the model"""
+    cache = PROMPT_CACHES.get(api_key.name)
+    if cache is None:
+        enabled = os.getenv('AI_PROMPT_CACHE', '1') != '0'
+        cache = PROMPT_CACHES.setdefault(api_key.name, PromptCache(ClientCacheBackend(client, types_module), enabled=enabled))
+    return cache
@@ -0,0 +1,41 @@
+import asyncio
+import time
+from collections import deque
+
+
+class SlidingWindowLimiter:
+    """Allow at most `max_calls` per `period` seconds per key (e.g. per channel)"""
+
+    def __init__(self, max_calls=5, period=5.0):
+        self.max_calls = max_calls
+        self.period = period
+        self._calls = {}  # key -> deque of monotonic timestamps
+
+    def delay(self, key):
+        """Seconds to wait before `key` may be used again (0 if free now)"""
+        calls = self._calls.get(key)
+        if not calls:
+            return 0.0
+        now = time.monotonic()
+        while calls and now - calls[0] >= self.period:
+            calls.popleft()
+        if len(calls) < self.max_calls:
+            return 0.0
+        return self.period - (now - calls[0])
+
+    def hit(self, key):
+        self._calls.setdefault(key, deque()).append(time.monotonic())
+
+    async def acquire(self, key):
+        """Wait for a free slot for `key` and take it"""
+        while True:
+            wait = self.delay(key)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+        self.hit(key)
+
+    def penalize(self, key, retry_after):
+        """Treat `key` as fully booked for `retry_after` seconds (after a 429)"""
+        until = time.monotonic() + retry_after - self.period
+        self._calls[key] = deque([until] * self.max_calls)
@@ -0,0 +1,90 @@
+import datetime
+import math
+import re
+
+# Recurrence rules are stored as short strings next to the reminder:
+#   "interval:<seconds>"          every N seconds, anchored on the previous fire time
+#   "weekly:<day mask>:<HH>:<MM>" on the given weekdays (bit 0 = Monday) at HH:MM UTC
+DAY_NAMES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+FULL_DAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+# Only exact 3-letter abbreviations or full names ("monkey" is not Monday)
+DAY_INDEX = {name: i for names in (DAY_NAMES, FULL_DAY_NAMES) for i, name in enumerate(names)}
+DAY_GROUPS = {"daily": 0b1111111, "everyday": 0b1111111, "weekdays": 0b0011111, "weekends": 0b1100000}
+INTERVAL_WORDS = {"hourly": 3600, "daily": 86400, "weekly": 7 * 86400}
+UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+DURATION_RE = re.compile(r'^(?:\d+[smhdw])+$')
+RULE_RE = re.compile(r'^([a-z,]+)@(\d{1,2})(?::(\d{2}))?$')
+
+
+def parse_recurrence(spec):
+    """Turn user input ("2h", "daily", "mon,wed@9:30", "weekdays@08:00") into a rule string, or None"""
+    spec = spec.strip().lower()
+
+    if spec in INTERVAL_WORDS:
+        return f"interval:{INTERVAL_WORDS[spec]}"
+
+    if DURATION_RE.match(spec):
+        seconds = sum(int(v) * UNIT_SECONDS[u] for v, u in re.findall(r'(\d+)([smhdw])', spec))
+        return f"interval:{seconds}" if seconds > 0 else None
+
+    m = RULE_RE.match(spec)
+    if not m:
+        return None
+    days, hour, minute = m.group(1), int(m.group(2)), int(m.group(3) or 0)
+    if hour > 23 or minute > 59:
+        return None
+
+    mask = 0
+    for part in days.split(","):
+        if part in DAY_GROUPS:
+            mask |= DAY_GROUPS[part]
+        elif part in DAY_INDEX:
+            mask |= 1 << DAY_INDEX[part]
+        else:
+            return None
+    return f"weekly:{mask}:{hour}:{minute}"
+
+
+def interval_of(rule):
+    """Seconds between fires for interval rules, None for weekday rules"""
+    kind, _, value = rule.partition(":")
+    return int(value) if kind == "interval" else None
+
+
+def next_fire(rule, previous, now):
+    """First fire time strictly after `now`. O(1) for intervals (missed fires are skipped, not
+    replayed), at most 8 day steps for weekday rules."""
+    kind, _, value = rule.partition(":")
+
+    if kind == "interval":
+        interval = int(value)
+        if previous > now:
+            return previous
+        skipped = math.floor((now - previous) / interval) + 1
+        return previous + skipped * interval
+
+    mask, hour, minute = (int(x) for x in value.split(":"))
+    start = datetime.datetime.fromtimestamp(now, tz=datetime.timezone.utc)
+    candidate = start.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    for _ in range(8):
+        if candidate.timestamp() > now and mask & (1 << candidate.weekday()):
+            return candidate.timestamp()
+        candidate += datetime.timedelta(days=1)
+    return None
+
+
+def describe(rule, format_seconds):
+    """Human readable rule, e.g. "every 2 hours" or "mon, wed at 09:30 UTC" """
+    kind, _, value = rule.partition(":")
+    if kind == "interval":
+        return f"every {format_seconds(int(value))}"
+
+    mask, hour, minute = (int(x) for x in value.split(":"))
+    for name, group in DAY_GROUPS.items():
+        if mask == group and name != "everyday":
+            days = name
+            break
+    else:
+        days = ", ".join(d for i, d in enumerate(DAY_NAMES) if mask & (1 << i))
+    return f"{days} at {hour:02d}:{minute:02d} UTC"
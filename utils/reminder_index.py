@@ -0,0 +1,48 @@
+class ReminderIndex:
+    """Pending reminders indexed by reminder id and by user id.
+
+    Listing or cancelling only touches the caller's own reminders instead of
+    scanning every reminder in the bot.
+    """
+
+    def __init__(self):
+        self._by_id = {}
+        self._by_user = {}  # user_id -> {reminder_id: reminder}
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, reminder_id):
+        return reminder_id in self._by_id
+
+    def get(self, reminder_id):
+        return self._by_id.get(reminder_id)
+
+    def values(self):
+        return self._by_id.values()
+
+    def add(self, reminder):
+        self._by_id[reminder["id"]] = reminder
+        self._by_user.setdefault(reminder["user_id"], {})[reminder["id"]] = reminder
+
+    def remove(self, reminder_id):
+        """Drop a reminder from both indexes and return it (or None)"""
+        reminder = self._by_id.pop(reminder_id, None)
+        if reminder is None:
+            return None
+        user_reminders = self._by_user.get(reminder["user_id"])
+        if user_reminders is not None:
+            user_reminders.pop(reminder_id, None)
+            if not user_reminders:
+                del self._by_user[reminder["user_id"]]
+        return reminder
+
+    def count_for_user(self, user_id):
+        return len(self._by_user.get(user_id, ()))
+
+    def for_user(self, user_id):
+        """A user's reminders, soonest first"""
+        user_reminders = self._by_user.get(user_id)
+        if not user_reminders:
+            return []
+        return sorted(user_reminders.values(), key=lambda r: r["reminder_time"])
@@ -0,0 +1,59 @@
+import time
+
+from utils.db import Database
+
+REMINDER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    reminder_time REAL NOT NULL,
+    message TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    recurrence TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reminders_time ON reminders (reminder_time);
+"""
+
+COLUMNS = ("id", "user_id", "channel_id", "reminder_time", "message", "recurrence")
+
+
+class ReminderStore:
+    """SQLite (WAL) copy of every pending reminder.
+
+    Rows are written when a reminder is created and deleted when it fires or is
+    cancelled, so whatever is in the table at startup is still pending. Recurring
+    reminders keep their single row; only reminder_time moves forward.
+    """
+
+    def __init__(self, path="reminders.db"):
+        self.db = Database(path, REMINDER_SCHEMA)
+        # Tables created before recurring reminders existed lack the column
+        columns = {row[1] for row in self.db.query_sync("PRAGMA table_info(reminders)")}
+        if "recurrence" not in columns:
+            self.db.query_sync("ALTER TABLE reminders ADD COLUMN recurrence TEXT")
+
+    def load_pending(self):
+        """All stored reminders, oldest due first (blocking - called once at startup)"""
+        rows = self.db.query_sync(f"SELECT {', '.join(COLUMNS)} FROM reminders ORDER BY reminder_time")
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def next_id(self):
+        """Next reminder id, never reusing ids handed out before a restart"""
+        rows = self.db.query_sync("SELECT seq FROM sqlite_sequence WHERE name = 'reminders'")
+        return (rows[0][0] if rows else 0) + 1
+
+    def add(self, reminder):
+        self.db.submit(
+            f"INSERT INTO reminders ({', '.join(COLUMNS)}, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            tuple(reminder.get(c) for c in COLUMNS) + (time.time(),)
+        )
+
+    def reschedule(self, reminder_id, reminder_time):
+        self.db.submit("UPDATE reminders SET reminder_time = ? WHERE id = ?", (reminder_time, reminder_id))
+
+    def delete(self, reminder_id):
+        self.db.submit("DELETE FROM reminders WHERE id = ?", (reminder_id,))
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,156 @@
+import re
+import time
+from collections import OrderedDict
+
+WORD_RE = re.compile(r"[a-z0-9']+")
+
+# Words that usually point back at something said earlier ("what about it?", "why did he...")
+CONTEXT_WORDS = {
+    "it", "its", "that", "this", "those", "these", "he", "she", "they", "him", "her", "them",
+    "his", "hers", "their", "also", "too", "again", "else", "more", "then", "same", "one",
+}
+SHORTHAND = {
+    "u": "you", "ur": "your", "r": "are", "y": "why", "pls": "please", "plz": "please",
+    "whats": "what is", "what's": "what is", "who's": "who is", "whos": "who is",
+    "wat": "what", "abt": "about", "rn": "right now", "ppl": "people",
+}
+# Different words for the same thing, folded together before anything is compared
+SYNONYMS = {
+    "created": "made", "built": "made", "coded": "made", "developed": "made", "programmed": "made",
+    "create": "make", "build": "make", "creator": "maker", "developer": "maker",
+    "could": "can", "favourite": "favorite", "fav": "favorite", "fave": "favorite",
+}
+CONTEXT_OPENERS = ("and ", "but ", "so ", "or ", "what about", "how about", "why not", "then ")
+# Filler dropped before comparing the words two questions are actually about. Question
+# words and pronouns stay: "how do i..." / "why do i..." and "do you..." / "do i..." differ.
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "am", "was", "were", "be", "do", "does", "did", "can",
+    "should", "will", "to", "of", "in", "on", "at", "for", "with", "about", "and", "or",
+    "please", "hey", "hi", "so", "just", "really",
+}
+QUESTION_WORDS = {"what", "who", "how", "why", "when", "where", "which"}
+
+
+class CacheEntry:
+    __slots__ = ("signature", "answer", "created_at")
+
+    def __init__(self, signature, answer, created_at):
+        self.signature = signature
+        self.answer = answer
+        self.created_at = created_at
+
+
+class ResponseCache:
+    """Answers repeated questions from memory instead of calling the model.
+
+    Questions are normalised (shorthand expanded, synonyms folded) and matched
+    exactly, or by their set of content words with filler removed, so "how do i
+    learn python" and "how can i learn python?" share an answer while "i'm sad"
+    never gets the answer to "i'm happy". The cache is shared by everyone, so
+    answers that name the asker are never stored. Entries live in a bounded LRU
+    with a TTL.
+    """
+
+    def __init__(self, max_entries=256, ttl=6 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # normalized question -> CacheEntry
+        self._by_signature = {}        # content words -> normalized question
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    @staticmethod
+    def normalize(text):
+        words = WORD_RE.findall(text.lower().replace("’", "'"))
+        words = " ".join(SHORTHAND.get(w, w) for w in words).split()
+        return " ".join(SYNONYMS.get(w, w) for w in words)
+
+    @staticmethod
+    def signature(normalized):
+        """The question's content words, or None when there's too little left to match on"""
+        words = frozenset(w for w in normalized.split() if w not in STOPWORDS)
+        # "what are you" and "what can you do" both come down to {what, you}: exact match only
+        if len(words - QUESTION_WORDS) < 2:
+            return None
+        return words
+
+    def depends_on_context(self, question, recent_turns=()):
+        """True when the question probably needs earlier turns to make sense"""
+        normalized = self.normalize(question)
+        if not normalized:
+            return True
+        if normalized.startswith(CONTEXT_OPENERS):
+            return True
+        if CONTEXT_WORDS.intersection(normalized.split()):
+            return True
+        # The bot just asked something - this message is most likely the answer
+        for turn in reversed(recent_turns):
+            if turn.role == "model":
+                return turn.content.rstrip().endswith("?")
+        return False
+
+    def lookup(self, question, recent_turns=()):
+        """Return a cached answer or None"""
+        if self.depends_on_context(question, recent_turns):
+            self.bypassed += 1
+            return None
+
+        normalized = self.normalize(question)
+        self._expire(time.time())
+
+        key = normalized
+        if key not in self._entries:
+            signature = self.signature(normalized)
+            key = self._by_signature.get(signature) if signature is not None else None
+
+        if key is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key].answer
+
+        self.misses += 1
+        return None
+
+    def store(self, question, answer, recent_turns=(), asker=None):
+        if not answer or self.depends_on_context(question, recent_turns):
+            return
+        if asker and self.mentions(answer, asker):
+            return
+        normalized = self.normalize(question)
+        signature = self.signature(normalized)
+        self._remove(normalized)
+        self._entries[normalized] = CacheEntry(signature, answer, time.time())
+        if signature is not None:
+            self._by_signature[signature] = normalized
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    @staticmethod
+    def mentions(answer, name):
+        """Whether the answer uses any word of `name` (e.g. "hey alex!" for "Alex ♡")"""
+        name_words = {w for w in WORD_RE.findall(name.lower()) if len(w) > 2} - STOPWORDS
+        return not name_words.isdisjoint(WORD_RE.findall(answer.lower()))
+
+    def clear(self):
+        self._entries.clear()
+        self._by_signature.clear()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None and self._by_signature.get(entry.signature) == key:
+            del self._by_signature[entry.signature]
+
+    def _expire(self, now):
+        # Entries are in LRU order, not insertion order, so check them all (the cache is small)
+        expired = [k for k, e in self._entries.items() if now - e.created_at > self.ttl]
+        for key in expired:
+            self._remove(key)
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+        }
@@ -0,0 +1,54 @@
+import heapq
+
+
+class HeapScheduler:
+    """Min-heap of (due_time, reminder_id) with lazy cancellation.
+
+    add / cancel are O(log n) / O(1); pop_due only touches entries that are
+    actually due. Cancelled entries stay in the heap until they surface (or until
+    they make up half of it, at which point the heap is rebuilt).
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._due = {}  # reminder_id -> due time of its live heap entry
+
+    def __len__(self):
+        return len(self._due)
+
+    def __contains__(self, reminder_id):
+        return reminder_id in self._due
+
+    def add(self, reminder_id, due):
+        """Schedule (or reschedule) a reminder"""
+        self._due[reminder_id] = due
+        heapq.heappush(self._heap, (due, reminder_id))
+
+    def cancel(self, reminder_id):
+        if self._due.pop(reminder_id, None) is None:
+            return False
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._due):
+            self._heap = [(due, rid) for rid, due in self._due.items()]
+            heapq.heapify(self._heap)
+        return True
+
+    def next_due(self):
+        """Due time of the earliest live reminder, or None"""
+        heap = self._heap
+        while heap:
+            due, reminder_id = heap[0]
+            if self._due.get(reminder_id) == due:
+                return due
+            heapq.heappop(heap)  # stale (cancelled / rescheduled)
+        return None
+
+    def pop_due(self, now):
+        """Remove and return the ids of every reminder due at or before `now`"""
+        heap = self._heap
+        fired = []
+        while heap and heap[0][0] <= now:
+            due, reminder_id = heapq.heappop(heap)
+            if self._due.get(reminder_id) == due:
+                del self._due[reminder_id]
+                fired.append(reminder_id)
+        return fired
@@ -0,0 +1,192 @@
+import heapq
+import math
+import time
+
+# (seconds per slot, slots): the minute wheel holds 1s slots, the hour wheel 1min
+# slots, the day wheel 1h slots and the last wheel 1d slots (~17 months).
+LEVELS = ((1, 60), (60, 60), (3600, 24), (86400, 512))
+# Location codes outside the level * 1024 + slot range
+OVERFLOW = -1
+READY = -2
+
+
+class TimingWheel:
+    """Hierarchical timing wheel for very large numbers of pending reminders.
+
+    Same interface as HeapScheduler (add / cancel / next_due / pop_due).
+    Insert and cancel are O(1): every reminder sits in exactly one slot dict and
+    its location is remembered. As time moves on, the slot of a coarser wheel is
+    cascaded down into the finer ones when its boundary is reached. Empty
+    stretches are skipped a whole slot at a time, so time spent idle costs almost
+    nothing.
+
+    Under CPython it is slower and bigger than HeapScheduler at every size we've
+    measured (200k reminders: 5.7 vs 0.5 µs per tick, 13.7 vs 1.9 µs per insert,
+    189 vs 145 B per reminder), so the heap stays the default.
+    """
+
+    def __init__(self, now=None):
+        self.current = int(time.time() if now is None else now)
+        self._slots = [[{} for _ in range(count)] for _, count in LEVELS]
+        self._counts = [0] * len(LEVELS)
+        self._overflow = []      # heap of (tick, reminder_id) past the last wheel
+        self._overflow_live = {}  # reminder_id -> tick
+        self._ready = {}         # reminder_id -> tick (already due, not yet popped)
+        self._location = {}      # reminder_id -> level * 1024 + slot (or OVERFLOW / READY)
+
+    def __len__(self):
+        return len(self._location)
+
+    def __contains__(self, reminder_id):
+        return reminder_id in self._location
+
+    # ----- public API -----
+    def add(self, reminder_id, due):
+        """Schedule (or reschedule) a reminder. Never fires early: due is rounded up."""
+        if reminder_id in self._location:
+            self.cancel(reminder_id)
+        self._place(reminder_id, math.ceil(due))
+
+    def cancel(self, reminder_id):
+        location = self._location.pop(reminder_id, None)
+        if location is None:
+            return False
+        if location == READY:
+            del self._ready[reminder_id]
+        elif location == OVERFLOW:
+            del self._overflow_live[reminder_id]  # heap entry is skipped lazily
+        else:
+            level, slot = divmod(location, 1024)
+            del self._slots[level][slot][reminder_id]
+            self._counts[level] -= 1
+        return True
+
+    def next_due(self):
+        """Earliest time something could fire. A lower bound: the cog wakes up,
+        calls pop_due, and asks again."""
+        if self._ready:
+            return self.current
+
+        best = None
+        c = self.current
+        if self._counts[0]:
+            slots = self._slots[0]
+            for tick in range(c + 1, c + 60):
+                if slots[tick % 60]:
+                    best = tick
+                    break
+
+        for level in range(1, len(LEVELS)):
+            if not self._counts[level]:
+                continue
+            unit, count = LEVELS[level]
+            slots = self._slots[level]
+            first = c // unit + 1
+            for index in range(first, first + count):
+                boundary = index * unit
+                if best is not None and boundary >= best:
+                    break
+                if slots[index % count]:
+                    best = boundary
+                    break
+
+        overflow_tick = self._overflow_head()
+        if overflow_tick is not None:
+            top_unit = LEVELS[-1][0]
+            boundary = (c // top_unit + 1) * top_unit
+            if best is None or boundary < best:
+                best = boundary
+
+        return best
+
+    def pop_due(self, now):
+        """Advance the wheel to `now` and return the ids of every reminder that fired"""
+        self._advance(int(now))
+        if not self._ready:
+            return []
+        fired = list(self._ready)
+        for reminder_id in fired:
+            del self._location[reminder_id]
+        self._ready.clear()
+        return fired
+
+    # ----- internals -----
+    def _place(self, reminder_id, tick):
+        delta = tick - self.current
+        if delta <= 0:
+            self._ready[reminder_id] = tick
+            self._location[reminder_id] = READY
+            return
+
+        for level, (unit, count) in enumerate(LEVELS):
+            if delta < unit * count:
+                slot = (tick // unit) % count
+                self._slots[level][slot][reminder_id] = tick
+                self._counts[level] += 1
+                self._location[reminder_id] = level * 1024 + slot
+                return
+
+        self._overflow_live[reminder_id] = tick
+        heapq.heappush(self._overflow, (tick, reminder_id))
+        self._location[reminder_id] = OVERFLOW
+
+    def _overflow_head(self):
+        heap = self._overflow
+        while heap:
+            tick, reminder_id = heap[0]
+            if self._overflow_live.get(reminder_id) == tick:
+                return tick
+            heapq.heappop(heap)
+        return None
+
+    def _next_stop(self, target):
+        """Furthest tick we can jump to without skipping a slot that has work in it"""
+        c = self.current
+        if self._counts[0]:
+            return c + 1
+        for level in range(1, len(LEVELS)):
+            if self._counts[level]:
+                unit = LEVELS[level][0]
+                return min(target, (c // unit + 1) * unit)
+        if self._overflow_live:
+            unit = LEVELS[-1][0]
+            return min(target, (c // unit + 1) * unit)
+        return target
+
+    def _cascade(self, level, slot):
+        bucket = self._slots[level][slot]
+        if not bucket:
+            return
+        self._slots[level][slot] = {}
+        self._counts[level] -= len(bucket)
+        for reminder_id, tick in bucket.items():
+            self._place(reminder_id, tick)
+
+    def _advance(self, target):
+        while self.current < target:
+            tick = self._next_stop(target)
+            self.current = tick
+
+            # Coarsest first, so cascaded reminders can cascade again on the same tick
+            top_unit, top_count = LEVELS[-1]
+            if tick % top_unit == 0 and self._overflow_live:
+                span = top_unit * top_count
+                while True:
+                    head = self._overflow_head()
+                    if head is None or head - tick >= span:
+                        break
+                    _, reminder_id = heapq.heappop(self._overflow)
+                    del self._overflow_live[reminder_id]
+                    self._place(reminder_id, head)
+            for level in range(len(LEVELS) - 1, 0, -1):
+                unit, count = LEVELS[level]
+                if tick % unit == 0 and self._counts[level]:
+                    self._cascade(level, (tick // unit) % count)
+
+            bucket = self._slots[0][tick % 60]
+            if bucket:
+                self._slots[0][tick % 60] = {}
+                self._counts[0] -= len(bucket)
+                for reminder_id, due in bucket.items():
+                    self._ready[reminder_id] = due
+                    self._location[reminder_id] = READY
@@ -0,0 +1,178 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+import discord
+
+QUERY_MEMBERS_LIMIT = 100  # user ids per guild member chunk request
+
+
+def member_info(member):
+    return {
+        'name': f"{member.display_name} ({member.name})",
+        'mention': member.mention,
+        'is_in_server': True
+    }
+
+
+def user_info(user):
+    return {
+        'name': f"{user.name}",
+        'mention': f"`{user.name}` (ID: {user.id})",
+        'is_in_server': False
+    }
+
+
+def unknown_info(user_id):
+    return {
+        'name': f"Unknown User (ID: {user_id})",
+        'mention': f"`Unknown User` (ID: {user_id})",
+        'is_in_server': False
+    }
+
+
+class UserResolver:
+    """Turns user ids into display info for a given guild.
+
+    Members of the guild come straight from its member cache. Everyone else is
+    looked up once and cached for `ttl` seconds; ids Discord says don't exist
+    are remembered for `negative_ttl` so they never cost another REST call.
+    `resolve_many` asks the gateway for missing members in chunks of 100 ids, only
+    when the guild isn't fully chunked, and remembers ids it didn't find for `ttl`.
+    """
+
+    def __init__(self, bot, ttl=600, negative_ttl=3600, max_entries=1024, fetch_concurrency=4):
+        self.bot = bot
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._fetch_pool = asyncio.Semaphore(fetch_concurrency)
+        self._cache = OrderedDict()  # user_id -> (expires_at, info)
+        self._not_members = OrderedDict()  # (guild_id, user_id) -> expires_at
+        self.hits = 0
+        self.fetches = 0
+
+    def _cached(self, user_id):
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._cache[user_id]
+            return None
+        self._cache.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def _store(self, user_id, info, ttl):
+        self._cache[user_id] = (time.monotonic() + ttl, info)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def invalidate(self, user_id):
+        self._cache.pop(user_id, None)
+
+    def _known_absent(self, guild_id, user_id):
+        expires_at = self._not_members.get((guild_id, user_id))
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del self._not_members[(guild_id, user_id)]
+            return False
+        return True
+
+    def _mark_absent(self, guild_id, user_ids):
+        expires_at = time.monotonic() + self.ttl
+        for user_id in user_ids:
+            self._not_members[(guild_id, user_id)] = expires_at
+            self._not_members.move_to_end((guild_id, user_id))
+        while len(self._not_members) > self.max_entries:
+            self._not_members.popitem(last=False)
+
+    async def resolve(self, user_id, guild=None):
+        """Info dict for one id: guild member > cached > bot user cache > fetch_user"""
+        if guild is not None:
+            member = guild.get_member(user_id)
+            if member:
+                return member_info(member)
+
+        info = self._cached(user_id)
+        if info is not None:
+            return info
+
+        user = self.bot.get_user(user_id)
+        if user:
+            info = user_info(user)
+            self._store(user_id, info, self.ttl)
+            return info
+        return await self._fetch(user_id)
+
+    async def _fetch(self, user_id):
+        async with self._fetch_pool:
+            # Another caller may have fetched it while we waited for the pool
+            info = self._cached(user_id)
+            if info is not None:
+                return info
+            self.fetches += 1
+            try:
+                user = await self.bot.fetch_user(user_id)
+            except discord.NotFound:
+                info = unknown_info(user_id)
+                self._store(user_id, info, self.negative_ttl)
+                return info
+            except discord.HTTPException:
+                return unknown_info(user_id)  # transient - don't cache
+            info = user_info(user)
+            self._store(user_id, info, self.ttl)
+            return info
+
+    async def resolve_many(self, user_ids, guild=None, fetch=True):
+        """{user_id: info} for many ids, using one member chunk query per 100 unresolved ids.
+
+        With fetch=False, ids that are still unknown afterwards get placeholder info
+        instead of a REST call each.
+        """
+        results = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            member = guild.get_member(user_id) if guild is not None else None
+            if member:
+                results[user_id] = member_info(member)
+                continue
+            info = self._cached(user_id)
+            if info is not None:
+                results[user_id] = info
+            else:
+                missing.append(user_id)
+
+        # A chunked guild's member cache is complete, so get_member already answered for everyone
+        to_query = [] if guild is None or guild.chunked else [
+            user_id for user_id in missing if not self._known_absent(guild.id, user_id)
+        ]
+        for i in range(0, len(to_query), QUERY_MEMBERS_LIMIT):
+            chunk = to_query[i:i + QUERY_MEMBERS_LIMIT]
+            try:
+                members = await guild.query_members(user_ids=chunk, cache=True)
+            except (asyncio.TimeoutError, discord.ClientException):
+                continue
+            for member in members:
+                results[member.id] = member_info(member)
+            self._mark_absent(guild.id, [user_id for user_id in chunk if user_id not in results])
+        missing = [user_id for user_id in missing if user_id not in results]
+
+        if missing and not fetch:
+            for user_id in missing:
+                user = self.bot.get_user(user_id)
+                if user:
+                    results[user_id] = user_info(user)
+                    self._store(user_id, results[user_id], self.ttl)
+                else:
+                    results[user_id] = unknown_info(user_id)
+        elif missing:
+            infos = await asyncio.gather(*(self.resolve(user_id) for user_id in missing))
+            results.update(zip(missing, infos))
+        return results
+
+    def stats(self):
+        return {"entries": len(self._cache), "not_members": len(self._not_members),
+                "hits": self.hits, "fetches": self.fetches}
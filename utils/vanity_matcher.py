@@ -0,0 +1,62 @@
+import os
+import re
+
+DEFAULT_VANITY_URLS = ("/cheriies", "discord.gg/cheriies")
+
+
+class VanityMatcher:
+    """Case-insensitive check for vanity URLs in a member's activities.
+
+    Every URL is compiled into one regex that runs once over the activity text
+    (name, details and state of all activities). The last fingerprint and result
+    per member are kept, so an unchanged status is never matched twice.
+    """
+
+    def __init__(self, urls=DEFAULT_VANITY_URLS):
+        self._cache = {}  # member_id -> (fingerprint, result)
+        self.hits = 0
+        self.misses = 0
+        self.set_urls(urls)
+
+    @classmethod
+    def from_env(cls):
+        """VANITY_URLS=/cheriies,discord.gg/cheriies (falls back to the defaults)"""
+        raw = os.getenv('VANITY_URLS', '')
+        urls = [u for u in raw.split(',') if u.strip()]
+        return cls(urls or DEFAULT_VANITY_URLS)
+
+    def set_urls(self, urls):
+        self.urls = list(dict.fromkeys(u.strip().lower() for u in urls if u.strip()))
+        # Longest first so the most specific alternative wins
+        pattern = "|".join(re.escape(u) for u in sorted(self.urls, key=len, reverse=True))
+        self._regex = re.compile(pattern, re.IGNORECASE) if pattern else None
+        self._cache.clear()
+
+    @staticmethod
+    def fingerprint(activities):
+        """The activity fields we match on, as a comparable tuple"""
+        fields = []
+        for activity in activities:
+            fields.append(activity.name)
+            fields.append(getattr(activity, 'details', None))
+            fields.append(getattr(activity, 'state', None))
+        return tuple(fields)
+
+    def matches(self, text):
+        return self._regex is not None and self._regex.search(text) is not None
+
+    def check(self, member_id, activities):
+        """Whether the activities mention a vanity URL (cached per member until they change)"""
+        fingerprint = self.fingerprint(activities)
+        cached = self._cache.get(member_id)
+        if cached is not None and cached[0] == fingerprint:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        result = self.matches("\n".join(field for field in fingerprint if field))
+        self._cache[member_id] = (fingerprint, result)
+        return result
+
+    def forget(self, member_id):
+        self._cache.pop(member_id, None)